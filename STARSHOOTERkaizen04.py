@@ -1,17 +1,94 @@
 import pyxel
 import random
 import math
+import os
+import time
+from arena import Arena
+from attract import AttractRecorder, ENEMY_TYPES, KIND_GROUND, load_attract
+from bullet_store import BulletStore
+from fire_control import FireControl, LatencyProbe
+from starfield import Starfield, scatter
+from trig_table import aim, deg, fan
+from timer_wheel import TimerWheel
 
 # --- 画面サイズ ---
 W, H = 160, 120
 SCENE_TITLE, SCENE_PLAY, SCENE_PAUSE, SCENE_BOSS = 0, 1, 2, 3
 SCENE_GAMEOVER, SCENE_STAGE_CLEAR, SCENE_ENDING = 4, 5, 6
 SCENE_TUTORIAL = 7 
+EFFECT_SCENES = (SCENE_TITLE, SCENE_TUTORIAL, SCENE_PLAY, SCENE_BOSS, SCENE_GAMEOVER)   # 爆発が進む場面 (敵を動かす場面)
 MAX_STAGE = 5
 POWER_MAX = 4
 
+# --- ロジックの更新間隔 ---
+# 描画は 60fps のまま、ゲームの更新は TICK_RATE 回/秒の固定間隔で行う (速さ・間隔はすべて1回の更新あたりの値)。
+# 処理落ちしたフレームは次のフレームでまとめて追いつくが、1フレームで最大 MAX_CATCHUP_TICKS 回まで。
+TICK_RATE = 36
+TICK_SEC = 1.0 / TICK_RATE
+MAX_CATCHUP_TICKS = 4
+FRAME_TICKS = TICK_RATE / 60   # 元の 60fps の1フレームが何回分か (0.6)。フレーム数で決まっていた値は round(フレーム数 * FRAME_TICKS) 回にする
+SPAWN_RATE_MIN = round(5 * FRAME_TICKS)      # 空中の敵の出現間隔の下限 (元は 5 フレーム = 3 回)
+BOSS_SHOT_MIN = round(3 * FRAME_TICKS)       # ボスの弾の間隔の下限 (元は 3 フレーム = 1.8 回 → 2 回)
+
+# 押した瞬間 (btnp) のボタン。表示フレームごとにためておき、次の更新で使う
+PRESS_START = 1 << 0   # ENTER / START
+PRESS_SPACE = 1 << 1   # SPACE
+PRESS_ANY = 1 << 2     # パッドの A/B/X/Y
+PRESS_FIRE = 1 << 3    # ショット (更新の合間に押して離した短い押下も撃てるように)
+FIRE_KEYS = [pyxel.KEY_Z, pyxel.KEY_X, pyxel.GAMEPAD1_BUTTON_A, pyxel.GAMEPAD1_BUTTON_B]
+
+# --- 弾 ---
+# 自機弾はパワーごとの角度 (真上が 0 度) から速度を起動時に求めておき、発射時はまとめて追加する
+SHOT_SPEED = 6
+SHOT_ANGLES = {1: (-5, 5), 2: (-5, 5, 180), 3: (-10, 0, 10, 170, 190), 4: (-10, 0, 10, 170, 190)}
+SHOT_VEL = {p: fan([deg(a-90) for a in angs], SHOT_SPEED) for p, angs in SHOT_ANGLES.items()}
+BOSS_SPREAD_SPEED = 2.2
+BOSS_SPREAD_VEL = fan([deg(90+a) for a in (-45, -20, 20, 45)], BOSS_SPREAD_SPEED)
+
+# --- 出現 ---
+# 地上物と空中の敵の出現は self.timers (timer_wheel.TimerWheel) に次の回を予約する。空中の敵は frame が spawn_rate() の倍数の回
+GROUND_INTERVAL = 100
+
+# --- 敵の種類 ---
+# 敵の "kind" は attract.ENEMY_TYPES の並びの番号。更新では敵を種類ごとに分け、ENEMY_KERNELS[kind](game, batch) でまとめて動かす
+SOTTA, KAPPA, CALDERON = range(len(ENEMY_TYPES))
+
+def move_sottas(g, batch):
+    vy = 1.5 + (g.stage * 0.1); tx = g.enemy_target_x()
+    for e in batch: e["t"] += 1; e["y"] += vy; e["x"] += (tx - e["x"]) * 0.05
+
+def move_kappas(g, batch):
+    tx = g.enemy_target_x()
+    for e in batch:
+        e["t"] += 1
+        if e["t"] < 35: e["y"] += 3.0
+        else:
+            if e["vx"] == 0: e["vx"] = 2.5 if e["x"] < tx else -2.5
+            e["x"] += e["vx"]; e["y"] += 0.6
+
+def move_calderons(g, batch):
+    every = max(12, 45 - g.stage*5); armed = g.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL); speed = 1.8 + (g.stage*0.3)
+    for e in batch:
+        e["t"] += 1; e["y"] += 1.2
+        if armed and e["t"] % every == 0: g.shoot_at_player(e["x"], e["y"], speed)
+
+ENEMY_KERNELS = (move_sottas, move_kappas, move_calderons)
+
+# --- タイトル背景のデモ (アトラクトモード) ---
+# タイトルと遊び方の画面では、記録しておいた敵の動きを再生するだけにする (ファイルがなければその場で動かす)。
+# デモは --record-attract で、タイトル画面を ATTRACT_WARMUP 回更新して敵が出そろってから ATTRACT_TICKS 回分記録する
+ATTRACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "starsoldier_attract.dat")
+ATTRACT_WARMUP = 150
+ATTRACT_TICKS = 1080
+
+# --- 背景の星 (縦スクロールの層) ---
+# 速い星はステージの色、遅い星は 13 で描く。速い層は仮の色 STAR_KEY で焼いておき、描画時に pal で差し替える
+STAR_KEY = 7
+STAR_LAYERS = [(12, 0.27, 13), (13, 0.39, 13), (17, 0.6, STAR_KEY), (18, 0.81, STAR_KEY)]  # (数, 表示フレームごとの速さ, 色)
+
 class StarSoldier:
-    def __init__(self):
+    def __init__(self, record_attract=None):
+        """record_attract: タイトル画面の敵の動きを記録して保存するデモファイル"""
         pyxel.init(W, H, title="STAR SHOTTER! KAI", fps=60)
         self.init_sound()
         self.stage_colors = {
@@ -21,6 +98,14 @@ class StarSoldier:
         self.gameover_timer = 0
         self.clear_timer = 0 
         self.scroll_y = 0    
+        self.starfield = Starfield(W, H, vertical=True)
+        for count, speed, col in STAR_LAYERS:
+            self.starfield.add_layer(scatter(count, W, H, (col,)), speed)
+        self.tick = 0; self.tick_acc = 0.0; self.last_time = time.perf_counter(); self.press_latch = 0
+        # 連射はクールダウン式 (押した更新で1発目)。F1 で押してから弾が出るまでの更新数を表示する
+        self.fire_ctl = FireControl(); self.fire_probe = LatencyProbe(); self.show_latency = False
+        self.attract_path = record_attract; self.attract_rec = AttractRecorder() if record_attract else None
+        self.attract = None if record_attract else load_attract(ATTRACT_PATH)
         self.reset_all()
         pyxel.playm(0, loop=True)
         pyxel.run(self.update, self.draw)
@@ -58,53 +143,71 @@ class StarSoldier:
         self.reset_stage_env()
         self.x, self.y = 80, 100
         self.respawn_player()
-        self.stars = [[random.randint(0, W), random.randint(0, H), (random.random()*1.2+0.3)*0.6] for _ in range(60)]
 
     def reset_stage_env(self):
-        self.frame = 0; self.stage_timer = 0; self.shots = []; self.enemy_shots = []
-        self.enemies = []; self.capsules = []; self.explosions = []; self.ground_targets = []; self.boss = None
+        self.frame = 0; self.stage_timer = 0; self.shots = BulletStore(64); self.enemy_shots = BulletStore(128)
+        self.enemies = Arena(); self.capsules = Arena(); self.explosions = Arena(); self.ground_targets = Arena(); self.boss = None
+        self.arenas = (self.enemies, self.capsules, self.explosions, self.ground_targets)
+        self.timers = TimerWheel(); self.timers.schedule(GROUND_INTERVAL, self.spawn_ground); self.timers.schedule(self.spawn_rate(), self.spawn_enemy)
 
     def respawn_player(self):
-        self.power = 1; self.inv_timer = 90; self.enemy_shots = []; self.barrier_hp = 0
+        self.power = 1; self.inv_timer = 54; self.enemy_shots.clear(); self.barrier_hp = 0; self.fire_ctl.reset()
 
-    def check_any_button(self):
+    def latch_input(self):
+        if pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START): self.press_latch |= PRESS_START
+        if pyxel.btnp(pyxel.KEY_SPACE): self.press_latch |= PRESS_SPACE
         for b in [pyxel.GAMEPAD1_BUTTON_A, pyxel.GAMEPAD1_BUTTON_B, pyxel.GAMEPAD1_BUTTON_X, pyxel.GAMEPAD1_BUTTON_Y]:
-            if pyxel.btnp(b): return True
-        return False
+            if pyxel.btnp(b): self.press_latch |= PRESS_ANY
+        if any(pyxel.btnp(k) for k in FIRE_KEYS): self.press_latch |= PRESS_FIRE
+
+    def pressed(self, bits):
+        return self.press_latch & bits
 
     def update(self):
-        for s in self.stars:
-            s[1] += s[2]
-            if s[1] > H: s[1], s[0] = 0, random.randint(0, W)
-        if not hasattr(self, 'scene_timer'): self.scene_timer = 0
+        # 表示フレームごと: 入力をためて、経過時間の分だけ固定間隔の更新を回す
+        self.latch_input()
+        if pyxel.btnp(pyxel.KEY_F1): self.show_latency = not self.show_latency
+        self.starfield.update()
+        now = time.perf_counter()
+        self.tick_acc += min(now - self.last_time, MAX_CATCHUP_TICKS * TICK_SEC)
+        self.last_time = now
+        while self.tick_acc >= TICK_SEC:
+            self.tick_acc -= TICK_SEC
+            self.update_tick()
+            self.press_latch = 0
+        self.update_effects()
+
+    def update_tick(self):
+        self.tick += 1
+        for arena in self.arenas: arena.compact()   # 前の回に消したものを詰める (並び順は出てきた順のまま)
         self.scene_timer += 1
         if self.scene == SCENE_TITLE:
-            self.update_play_logic()
-            if self.scene_timer > 840 or pyxel.btnp(pyxel.KEY_SPACE) or self.check_any_button():
+            self.update_attract()
+            if self.scene_timer > 504 or self.pressed(PRESS_SPACE | PRESS_ANY):
                 self.scene = SCENE_TUTORIAL; self.scene_timer = 0; pyxel.playm(1, loop=True)
-            if pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START): 
+            if self.pressed(PRESS_START): 
                 self.scene_timer = 0; self.handle_start_button()
         elif self.scene == SCENE_TUTORIAL:
-            self.update_play_logic()
-            if self.scene_timer > 420 or pyxel.btnp(pyxel.KEY_SPACE) or self.check_any_button():
+            self.update_attract()
+            if self.scene_timer > 252 or self.pressed(PRESS_SPACE | PRESS_ANY):
                 self.scene = SCENE_TITLE; self.scene_timer = 0; pyxel.playm(0, loop=True)
-            if pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START): 
+            if self.pressed(PRESS_START): 
                 self.scene_timer = 0; self.handle_start_button()
         elif self.scene == SCENE_GAMEOVER:
             self.update_entities()
             if self.boss: self.update_boss()
-            if self.scene_timer > 480: 
+            if self.scene_timer > 288: 
                 self.reset_all(); self.scene = SCENE_TITLE; pyxel.playm(0, loop=True)
         elif self.scene == SCENE_STAGE_CLEAR:
             self.clear_timer += 1
-            if self.clear_timer > 120 or pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START):
+            if self.clear_timer > 72 or self.pressed(PRESS_START):
                 self.scene_timer = 0; self.next_stage()
         elif self.scene == SCENE_ENDING:
-            self.scroll_y += 0.5 * 0.6
-            if pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START):
-                self.scene = SCENE_TITLE; self.scene_timer = 0; pyxel.playm(0, loop=True)
+            self.scroll_y += 0.5
+            if self.pressed(PRESS_START):
+                self.reset_all(); self.scene = SCENE_TITLE; self.scene_timer = 0; pyxel.playm(0, loop=True)
         elif self.scene in (SCENE_PLAY, SCENE_BOSS, SCENE_PAUSE):
-            if pyxel.btnp(pyxel.KEY_RETURN) or pyxel.btnp(pyxel.GAMEPAD1_BUTTON_START):
+            if self.pressed(PRESS_START):
                 self.handle_start_button(); self.scene_timer = 0
             if self.scene != SCENE_PAUSE:
                 self.update_play()
@@ -116,117 +219,103 @@ class StarSoldier:
         elif self.scene == SCENE_PLAY: self.scene = SCENE_PAUSE; pyxel.stop()
         elif self.scene == SCENE_PAUSE: self.scene = SCENE_PLAY; pyxel.playm(1, loop=True)
 
+    def update_attract(self):
+        if self.attract: self.attract.advance(); return
+        self.update_play_logic()
+        rec = self.attract_rec
+        if rec and self.frame > ATTRACT_WARMUP:
+            rec.record(self.enemies, self.ground_targets)
+            if rec.frames >= ATTRACT_TICKS:
+                rec.save(self.attract_path); print(f"saved {self.attract_path} ({len(rec.to_bytes())} bytes)"); self.attract_rec = None
+
     def update_play_logic(self):
-        self.frame += 1
-        curr_stg = self.stage if self.scene not in (SCENE_TITLE, SCENE_TUTORIAL) else 1
-        if self.frame % 166 == 0: self.ground_targets.append({"x": random.randint(20, W-20), "y": -15, "hp": 5})
-        spawn_rate = max(5, int((35 - curr_stg * 6) / 0.6))
-        if self.frame % spawn_rate == 0:
-            self.enemies.append({"x": random.randint(10, W-10), "y": -10, "type": random.choice(["sotta", "kappa", "calderon"]), "t": 0, "vx": 0, "vy": 0})
+        self.frame += 1; self.timers.advance()
         self.update_entities()
 
+    def spawn_rate(self):
+        curr_stg = self.stage if self.scene not in (SCENE_TITLE, SCENE_TUTORIAL) else 1
+        return max(SPAWN_RATE_MIN, 35 - curr_stg * 6)
+
+    def spawn_ground(self):
+        self.ground_targets.add({"x": random.randint(20, W-20), "y": -15, "hp": 5}); self.timers.schedule(GROUND_INTERVAL, self.spawn_ground)
+
+    def spawn_enemy(self):
+        self.enemies.add({"x": random.randint(10, W-10), "y": -10, "kind": random.choice((SOTTA, KAPPA, CALDERON)), "t": 0, "vx": 0, "vy": 0})
+        rate = self.spawn_rate(); self.timers.schedule(rate - self.frame % rate, self.spawn_enemy)
+
     def update_play(self):
         self.stage_timer += 1
         if self.inv_timer > 0: self.inv_timer -= 1
         dx = (pyxel.btn(pyxel.KEY_RIGHT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_RIGHT)) - (pyxel.btn(pyxel.KEY_LEFT) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_LEFT))
         dy = (pyxel.btn(pyxel.KEY_DOWN) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_DOWN)) - (pyxel.btn(pyxel.KEY_UP) or pyxel.btn(pyxel.GAMEPAD1_BUTTON_DPAD_UP))
-        self.x = max(0, min(W-8, self.x + dx * 1.6 * 0.6))
-        self.y = max(0, min(H-8, self.y + dy * 1.6 * 0.6))
-        shot_interval = int((12 if self.power == 1 else 6) / 0.6)
-        if any(pyxel.btn(k) for k in [pyxel.KEY_Z, pyxel.KEY_X, pyxel.GAMEPAD1_BUTTON_A, pyxel.GAMEPAD1_BUTTON_B]):
-            if pyxel.frame_count % shot_interval == 0:
-                self.fire(); pyxel.play(0, 0)
+        self.x = max(0, min(W-8, self.x + dx * 1.6))
+        self.y = max(0, min(H-8, self.y + dy * 1.6))
+        shot_interval = 12 if self.power == 1 else 6
+        shooting = any(pyxel.btn(k) for k in FIRE_KEYS) or self.pressed(PRESS_FIRE)
+        self.fire_probe.tick(shooting)
+        if self.fire_ctl.update(shooting, shot_interval): self.fire(); pyxel.play(0, 0)
         if self.scene == SCENE_PLAY:
             self.update_play_logic()
-            if self.stage_timer > (1100 + self.stage * 100) / 0.6: self.init_boss()
+            if self.stage_timer > 1100 + self.stage * 100: self.init_boss()
         else: self.update_entities()
 
     def fire(self):
-        if self.power >= 4:
-            for ang in [-10, 0, 10, 170, 190]: self.shots.append([self.x+4, self.y, ang])
-        elif self.power == 3:
-            for ang in [-10, 0, 10, 170, 190]: self.shots.append([self.x+4, self.y, ang])
-        elif self.power == 2:
-            for ang in [-5, 5, 180]: self.shots.append([self.x+4, self.y, ang])
-        else:
-            for ang in [-5, 5]: self.shots.append([self.x+4, self.y, ang])
+        dx, dy = SHOT_VEL[min(self.power, POWER_MAX)]
+        self.shots.spawn_batch(self.x+4, self.y, dx, dy); self.fire_probe.spawned()
 
     def update_entities(self):
-        for s in self.shots[:]:
-            rad = math.radians(s[2]-90)
-            s[0] += math.cos(rad)*6*0.6; s[1] += math.sin(rad)*6*0.6
-            if not (-10 < s[1] < H+10 and -10 < s[0] < W+10):
-                if s in self.shots: self.shots.remove(s)
+        self.shots.step(); self.shots.cull(-10, -10, W+10, H+10)
         
-        for g in self.ground_targets[:]:
-            g["y"] += 0.5 * 0.6
-            for s in self.shots[:]:
-                if abs(g["x"]-s[0]) < 8 and abs(g["y"]-s[1]) < 8:
-                    g["hp"] -= 1
-                    if s in self.shots: self.shots.remove(s)
-                    if g["hp"] <= 0:
-                        self.score += 1000; pyxel.play(1, 1)
-                        if g in self.ground_targets: self.ground_targets.remove(g)
-                        self.explosions.append([g["x"], g["y"], 0])
-                    break
-            if g["y"] > H:
-                if g in self.ground_targets: self.ground_targets.remove(g)
-
-        for e in self.enemies[:]:
-            e["t"] += 1
-            if e["type"] == "sotta":
-                e["y"] += (1.5 + (self.stage * 0.1)) * 0.6
-                target_x = self.x if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) else W//2
-                e["x"] += (target_x - e["x"]) * 0.05 * 0.6
-            elif e["type"] == "kappa":
-                if e["t"] < 35 / 0.6: e["y"] += 3.0 * 0.6
+        grounds = list(self.ground_targets.items())
+        for gh, g in grounds: g["y"] += 0.5
+        hits = self.shots.take_hits([g["x"] for _, g in grounds], [g["y"] for _, g in grounds], 8, 8)
+        for (gh, g), hit in zip(grounds, hits.tolist()):
+            if hit:
+                g["hp"] -= 1
+                if g["hp"] <= 0:
+                    self.score += 1000; pyxel.play(1, 1)
+                    self.ground_targets.remove(gh)
+                    self.explosions.add([g["x"], g["y"], 0])
+            if g["y"] > H: self.ground_targets.remove(gh)
+
+        # 敵を全部動かしてから、自機弾との当たりを一度に調べる
+        enemies = list(self.enemies.items())
+        batches = [[] for _ in ENEMY_KERNELS]
+        for eh, e in enemies: batches[e["kind"]].append(e)
+        for kernel, batch in zip(ENEMY_KERNELS, batches):
+            if batch: kernel(self, batch)
+        hits = self.shots.take_hits([e["x"] for _, e in enemies], [e["y"] for _, e in enemies], 6, 6)
+        for (eh, e), hit in zip(enemies, hits.tolist()):
+            if hit:
+                self.score += 100; self.explosions.add([e["x"], e["y"], 0]); pyxel.play(1, 1)
+                self.enemies.remove(eh)
+                self.kill_count += 1
+                if self.kill_count >= 10:
+                    if random.random() > (self.stage * 0.18):
+                        self.capsules.add({"x": e["x"], "y": e["y"], "type": "barrier"})
+                    self.kill_count = 0
                 else:
-                    if e["vx"] == 0: target_x = self.x if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) else W//2; e["vx"] = 2.5 * 0.6 if e["x"] < target_x else -2.5 * 0.6
-                    e["x"] += e["vx"]; e["y"] += 0.6 * 0.6
-            elif e["type"] == "calderon":
-                e["y"] += 1.2 * 0.6
-                if e["t"] % max(20, int((45 - self.stage*5) / 0.6)) == 0 and self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL): 
-                    self.shoot_at_player(e["x"], e["y"], (1.8 + (self.stage*0.3)) * 0.6)
-            for s in self.shots[:]:
-                if abs(e["x"]-s[0]) < 6 and abs(e["y"]-s[1]) < 6:
-                    self.score += 100; self.explosions.append([e["x"], e["y"], 0]); pyxel.play(1, 1)
-                    if e in self.enemies: self.enemies.remove(e)
-                    if s in self.shots: self.shots.remove(s)
-                    self.kill_count += 1
-                    if self.kill_count >= 10:
-                        if random.random() > (self.stage * 0.18):
-                            self.capsules.append({"x": e["x"], "y": e["y"], "type": "barrier"})
-                        self.kill_count = 0
-                    else:
-                        rand_val = random.random()
-                        drop_rate_factor = max(0.05, 0.8 - (self.stage * 0.15))
-                        if rand_val < 0.04 * drop_rate_factor: self.capsules.append({"x": e["x"], "y": e["y"], "type": "1up"})
-                        elif rand_val < 0.12 * drop_rate_factor: self.capsules.append({"x": e["x"], "y": e["y"], "type": "power"})
-                    break
-            if e in self.enemies and self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) and self.inv_timer == 0:
+                    rand_val = random.random()
+                    drop_rate_factor = max(0.05, 0.8 - (self.stage * 0.15))
+                    if rand_val < 0.04 * drop_rate_factor: self.capsules.add({"x": e["x"], "y": e["y"], "type": "1up"})
+                    elif rand_val < 0.12 * drop_rate_factor: self.capsules.add({"x": e["x"], "y": e["y"], "type": "power"})
+            if self.enemies.alive(eh) and self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) and self.inv_timer == 0:
                 if abs(e["x"]-(self.x+4)) < 6 and abs(e["y"]-(self.y+4)) < 6: self.hit_player()
-            if e["y"] > H:
-                if e in self.enemies: self.enemies.remove(e)
-
-        for s in self.enemy_shots[:]:
-            if len(s) == 2: s[1] += (2.2 + (self.stage * 0.1)) * 0.6
-            else: s[0] += s[2]; s[1] += s[3]
-            if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) and self.inv_timer == 0:
-                if abs(s[0]-(self.x+4)) < 4 and abs(s[1]-(self.y+4)) < 4: 
-                    self.hit_player()
-                    if s in self.enemy_shots: self.enemy_shots.remove(s)
-            if not (-20 < s[1] < H+20 and -20 < s[0] < W+20):
-                if s in self.enemy_shots: self.enemy_shots.remove(s)
-
-        for c in self.capsules[:]:
-            c["y"] += 0.8 * 0.6
+            if e["y"] > H: self.enemies.remove(eh)
+
+        self.enemy_shots.step()
+        if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) and self.inv_timer == 0:
+            if self.enemy_shots.take_hits([self.x+4], [self.y+4], 4, 4)[0]: self.hit_player()
+        self.enemy_shots.cull(-20, -20, W+20, H+20)
+
+        for ch, c in self.capsules.items():
+            c["y"] += 0.8
             if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) and abs(c["x"]-(self.x+4)) < 8 and abs(c["y"]-(self.y+4)) < 8:
                 if c["type"] == "power":
                     if self.power >= POWER_MAX:
-                        for e in self.enemies[:]:
-                            self.score += 100; self.explosions.append([e["x"], e["y"], 0])
-                            self.enemies.remove(e)
-                        self.enemy_shots = []
+                        for e in self.enemies:
+                            self.score += 100; self.explosions.add([e["x"], e["y"], 0])
+                        self.enemies.clear(); self.enemy_shots.clear()
                         if self.boss: self.boss["hp"] -= 20
                         pyxel.play(1, 1)
                     else:
@@ -234,39 +323,45 @@ class StarSoldier:
                     self.score += 500; pyxel.play(2, 2)
                 elif c["type"] == "barrier":
                     if self.barrier_hp > 0 or self.inv_timer > 0:
-                        for e in self.enemies[:]:
-                            self.score += 100; self.explosions.append([e["x"], e["y"], 0])
-                            self.enemies.remove(e)
-                        self.enemy_shots = []
+                        for e in self.enemies:
+                            self.score += 100; self.explosions.add([e["x"], e["y"], 0])
+                        self.enemies.clear(); self.enemy_shots.clear()
                         if self.boss: self.boss["hp"] -= 20
                         pyxel.play(1, 1)
                     self.barrier_hp = 3; self.score += 500; pyxel.play(2, 2)
                 elif c["type"] == "1up": self.lives += 1; self.score += 1000; pyxel.play(3, 1)
-                self.capsules.remove(c)
-            elif c["y"] > H: self.capsules.remove(c)
+                self.capsules.remove(ch)
+            elif c["y"] > H: self.capsules.remove(ch)
 
-        for ex in self.explosions[:]:
+
+    def update_effects(self):
+        # 爆発は見た目だけなので表示フレームごとに進める。ただし元と同じく敵を動かす場面だけで、ポーズ中やステージクリア中は止める
+        if self.scene not in EFFECT_SCENES: return
+        for h, ex in self.explosions.items():
             ex[2] += 1
-            if ex[2] > 12: self.explosions.remove(ex)
+            if ex[2] > 12: self.explosions.remove(h)
+
+    def enemy_target_x(self):
+        return self.x if self.scene not in (SCENE_TITLE, SCENE_GAMEOVER, SCENE_TUTORIAL) else W//2
 
     def shoot_at_player(self, ex, ey, speed):
-        ang = math.atan2((self.y+4)-ey, (self.x+4)-ex); self.enemy_shots.append([ex, ey, math.cos(ang)*speed, math.sin(ang)*speed])
+        self.enemy_shots.spawn(ex, ey, *aim((self.x+4)-ex, (self.y+4)-ey, speed))
 
     def hit_player(self):
         if self.barrier_hp > 0:
-            self.barrier_hp -= 1; pyxel.play(3, 0); self.inv_timer = 30; return
-        self.lives -= 1; pyxel.play(1, 1); self.explosions.append([self.x+4, self.y+4, 0])
+            self.barrier_hp -= 1; pyxel.play(3, 0); self.inv_timer = 18; return
+        self.lives -= 1; pyxel.play(1, 1); self.explosions.add([self.x+4, self.y+4, 0])
         if self.lives <= 0: self.scene = SCENE_GAMEOVER; self.scene_timer = 0; pyxel.playm(3, loop=False)
         else: self.respawn_player()
 
     def init_boss(self):
-        self.scene = SCENE_BOSS; self.enemies = []; self.ground_targets = []
+        self.scene = SCENE_BOSS; self.enemies.clear(); self.ground_targets.clear()
         self.boss = {"x": 80, "y": -20, "hp": 100 + self.stage * 60, "t": 0}; pyxel.playm(2, loop=True)
 
     def update_boss(self):
         b = self.boss
         if not b: return
-        b["t"] += 0.05 * 0.6; b["y"] = min(25, b["y"] + 0.5 * 0.6)
+        b["t"] += 0.05; b["y"] = min(25, b["y"] + 0.5)
         if self.stage == 1: b["x"] = 80 + math.sin(b["t"]) * 40
         elif self.stage == 2: b["x"] = 80 + math.cos(b["t"] * 1.2) * 60; b["y"] = 25 + math.sin(b["t"] * 2.0) * 10
         elif self.stage == 3: b["x"] = 80 + math.sin(b["t"]) * 60; b["y"] = 25 + math.sin(b["t"] * 2) * 15
@@ -275,18 +370,15 @@ class StarSoldier:
             if int(b["t"]) % 2 == 0: b["x"] += math.sin(b["t"] * 10) * 5
         else: b["x"] = 80 + math.cos(b["t"] * 1.5) * 50; b["y"] = 30 + math.sin(b["t"] * 1.5) * 20
         if self.scene != SCENE_GAMEOVER:
-            shot_interval = max(3, int((22 - self.stage * 4) / 0.6))
-            if pyxel.frame_count % shot_interval == 0:
+            shot_interval = max(BOSS_SHOT_MIN, 22 - self.stage * 4)
+            if self.tick % shot_interval == 0:
                 if self.stage >= 2 and random.random() < (0.2 + self.stage * 0.15):
-                    self.shoot_at_player(b["x"], b["y"], (2.0 + (self.stage * 0.35)) * 0.6)
-                else: self.enemy_shots.append([b["x"], b["y"]])
-                if self.stage >= 3 and pyxel.frame_count % (shot_interval * 3) == 0:
-                    for a in [-45, -20, 20, 45]:
-                        rad = math.radians(90 + a); self.enemy_shots.append([b["x"], b["y"], math.cos(rad)*2.2*0.6, math.sin(rad)*2.2*0.6])
-        for s in self.shots[:]:
-            if abs(s[0]-b["x"]) < 20 and abs(s[1]-b["y"]) < 15:
-                b["hp"] -= 1; self.score += 50
-                if s in self.shots: self.shots.remove(s)
+                    self.shoot_at_player(b["x"], b["y"], 2.0 + (self.stage * 0.35))
+                else: self.enemy_shots.spawn(b["x"], b["y"], 0, 2.2 + (self.stage * 0.1))
+                if self.stage >= 3 and self.tick % (shot_interval * 3) == 0:
+                    self.enemy_shots.spawn_batch(b["x"], b["y"], *BOSS_SPREAD_VEL)
+        hits = self.shots.hit_test(b["x"], b["y"], 20, 15)
+        b["hp"] -= hits; self.score += 50 * hits
         if b["hp"] <= 0:
             self.score += 10000; self.scene = SCENE_STAGE_CLEAR; self.clear_timer = 0; self.boss = None; pyxel.play(2, 2); pyxel.stop()
 
@@ -295,7 +387,7 @@ class StarSoldier:
         else: 
             p, b, s, l = self.power, self.barrier_hp, self.score, self.lives
             self.stage += 1; self.scene = SCENE_PLAY; self.reset_stage_env()
-            self.x, self.y = 80, 100; self.inv_timer = 90
+            self.x, self.y = 80, 100; self.inv_timer = 54
             self.power, self.barrier_hp, self.score, self.lives = p, b, s, l
             pyxel.playm(1, loop=True)
 
@@ -303,33 +395,16 @@ class StarSoldier:
         draw_stage = self.stage if self.scene not in (SCENE_TITLE, SCENE_ENDING, SCENE_TUTORIAL) else 1
         star_col, bg_col = self.stage_colors.get(draw_stage, (7, 1))
         pyxel.cls(bg_col)
-        for s in self.stars:
-            col = star_col if s[2] > (0.8 * 0.6) else 13
-            pyxel.pset(s[0], s[1], col)
+        pyxel.pal(STAR_KEY, star_col); self.starfield.draw(); pyxel.pal()
         if self.scene == SCENE_ENDING: self.draw_ending(); return
-        for g in self.ground_targets:
-            gx, gy = g["x"], g["y"]
-            pyxel.rect(gx-7, gy-7, 14, 14, 13); pyxel.rectb(gx-7, gy-7, 14, 14, 7)
-            for dx, dy in [(-5,-5), (5,-5), (-5,5), (5,5)]: pyxel.pset(gx+dx, gy+dy, 7)
-            pyxel.circ(gx, gy, 4, 1); pyxel.circb(gx, gy, 4, 7)
-            core_col = 8 if pyxel.frame_count % 10 < 5 else 2
-            pyxel.pset(gx, gy, core_col)
-        for e in self.enemies:
-            ex, ey = e["x"], e["y"]
-            if e["type"] == "sotta":
-                rot = (pyxel.frame_count // 2) % 4
-                pyxel.circ(ex, ey, 3, 1); pyxel.circb(ex, ey, 3, 12)
-                pyxel.pset(ex + math.cos(rot)*2, ey + math.sin(rot)*2, 7)
-            elif e["type"] == "kappa":
-                pyxel.tri(ex, ey+4, ex-5, ey-2, ex+5, ey-2, 12)
-                pyxel.line(ex, ey-2, ex, ey+4, 7); pyxel.pset(ex, ey+1, 8)
-            else: 
-                pyxel.rect(ex-4, ey-4, 8, 8, 13); pyxel.rectb(ex-4, ey-4, 8, 8, 7)
-                pyxel.line(ex-4, ey, ex+3, ey, 5); pyxel.line(ex, ey-4, ex, ey+3, 5)
-                for dx, dy in [(-3,-3), (2,-3), (-3,2), (2,2)]: pyxel.pset(ex+dx, ey+dy, 7)
-                pyxel.pset(ex, ey, 9)
-        for s in self.shots: pyxel.rect(s[0], s[1], 1, 4, 10)
-        for s in self.enemy_shots: pyxel.circ(s[0], s[1], 1, 8)
+        if self.attract and self.scene in (SCENE_TITLE, SCENE_TUTORIAL):
+            for kind, x, y in self.attract.entities():
+                if kind == KIND_GROUND: self.draw_ground_target(x, y)
+                else: self.draw_enemy(kind, x, y)
+        for g in self.ground_targets: self.draw_ground_target(g["x"], g["y"])
+        for e in self.enemies: self.draw_enemy(e["kind"], e["x"], e["y"])
+        for sx, sy in self.shots.positions(): pyxel.rect(sx, sy, 1, 4, 10)
+        for sx, sy in self.enemy_shots.positions(): pyxel.circ(sx, sy, 1, 8)
         for c in self.capsules:
             if c["type"] == "barrier":
                 col = 12 if pyxel.frame_count % 4 < 2 else 6
@@ -385,6 +460,28 @@ class StarSoldier:
             for i in range(self.lives): pyxel.rect(32 + i*6, 112, 3, 5, 8)
             b_status = f" B:{self.barrier_hp}" if self.barrier_hp > 0 else ""
             pyxel.text(100, 112, f"POWER {self.power}{b_status}", 10)
+        if self.show_latency: pyxel.text(5, 104, self.fire_probe.label(), 11)
+
+    def draw_ground_target(self, gx, gy):
+        pyxel.rect(gx-7, gy-7, 14, 14, 13); pyxel.rectb(gx-7, gy-7, 14, 14, 7)
+        for dx, dy in [(-5,-5), (5,-5), (-5,5), (5,5)]: pyxel.pset(gx+dx, gy+dy, 7)
+        pyxel.circ(gx, gy, 4, 1); pyxel.circb(gx, gy, 4, 7)
+        core_col = 8 if pyxel.frame_count % 10 < 5 else 2
+        pyxel.pset(gx, gy, core_col)
+
+    def draw_enemy(self, kind, ex, ey):
+        if kind == SOTTA:
+            rot = (pyxel.frame_count // 2) % 4
+            pyxel.circ(ex, ey, 3, 1); pyxel.circb(ex, ey, 3, 12)
+            pyxel.pset(ex + math.cos(rot)*2, ey + math.sin(rot)*2, 7)
+        elif kind == KAPPA:
+            pyxel.tri(ex, ey+4, ex-5, ey-2, ex+5, ey-2, 12)
+            pyxel.line(ex, ey-2, ex, ey+4, 7); pyxel.pset(ex, ey+1, 8)
+        else: 
+            pyxel.rect(ex-4, ey-4, 8, 8, 13); pyxel.rectb(ex-4, ey-4, 8, 8, 7)
+            pyxel.line(ex-4, ey, ex+3, ey, 5); pyxel.line(ex, ey-4, ex, ey+3, 5)
+            for dx, dy in [(-3,-3), (2,-3), (-3,2), (2,2)]: pyxel.pset(ex+dx, ey+dy, 7)
+            pyxel.pset(ex, ey, 9)
 
     def draw_ending(self):
         texts = ["CONGRATULATIONS!", "", "YOU HAVE SAVED", "THE GALAXY", "", "--- STAFF ---", "", "DIRECTOR: M.T", "GRAPHIC: M.T", "MUSIC: M.T", "SPECIAL THANKS: YOU", "", "", "PRESENTED BY", "MIRAI WORK 2026"]
@@ -393,4 +490,10 @@ class StarSoldier:
             if -10 < y < H + 10: pyxel.text(W//2 - len(t)*2, y, t, 7 if i % 2 == 0 else 10)
         if H - self.scroll_y + len(texts) * 12 < -20: pyxel.text(45, 60, "THANKS FOR PLAYING", pyxel.frame_count % 16)
 
-StarSoldier()
\ No newline at end of file
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="STAR SHOTTER! KAI")
+    parser.add_argument("--record-attract", metavar="PATH", nargs="?", const=ATTRACT_PATH, help="タイトル画面の敵の動きをデモファイルに記録する")
+    args, _ = parser.parse_known_args()
+    StarSoldier(record_attract=args.record_attract)
@@ -0,0 +1,106 @@
+# arena.py
+# 弾・敵などのエンティティを入れておく世代付きアリーナ
+# list.remove() は中身を先頭から探すので、多数の弾と敵が当たる場面では O(n·m) のループの中で
+# さらに O(n) かかる。アリーナは中身を追加した順のリストに置き、削除はその位置に「消えた」印を付けるだけの O(1) で行う。
+# 印の付いた所は compact() (1回の更新に1度呼ぶ) でまとめて詰めるので、並び順は追加した順のまま変わらない。
+# add() が返すハンドル (整数) は削除すると世代が進むので、消えたものを指すハンドルは無効になる。pyxel には依存しない。
+
+from itertools import compress
+
+SLOT_BITS = 20
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class Arena:
+    """追加した順のリスト + 世代付きハンドルで、追加・削除・生存確認を O(1) で行う入れ物
+
+    ループの途中で消すときは items() を回す (その時点の写しなので、remove() しても飛ばしや重複が起きない)。
+    同じループの中で先に消したものはそのまま回ってくるので、必要なら alive(h) で確かめる。
+    __iter__ と items() は追加した順に回る。消した所は compact() まで印を付けて飛ばすだけなので、
+    消した数が多いまま回し続けないよう、更新ごとに compact() を呼ぶ。
+    """
+
+    def __init__(self):
+        self._items = []       # 中身 (追加した順。消した所は None)
+        self._handles = []     # _items[i] のハンドル
+        self._live = []        # _items[i] が生きていれば 1
+        self._dead = 0         # 消した印の数
+        self._pos = []         # スロット → _items の位置
+        self._gen = []         # スロットの世代
+        self._free = []        # 空きスロット
+
+    def __len__(self):
+        return len(self._items) - self._dead
+
+    def __iter__(self):
+        # 描画など、回しながら消さないとき用
+        if self._dead:
+            return compress(self._items, self._live)
+        return iter(self._items)
+
+    def items(self):
+        """(ハンドル, 中身) の写し。回しながら remove()/add() してよい"""
+        pairs = zip(self._handles[:], self._items[:])
+        if self._dead:
+            return compress(pairs, self._live[:])
+        return pairs
+
+    def add(self, item):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._gen)
+            self._gen.append(0)
+            self._pos.append(0)
+        h = (self._gen[slot] << SLOT_BITS) | slot
+        self._pos[slot] = len(self._items)
+        self._items.append(item)
+        self._handles.append(h)
+        self._live.append(1)
+        return h
+
+    def alive(self, h):
+        slot = h & SLOT_MASK
+        return slot < len(self._gen) and self._gen[slot] == h >> SLOT_BITS
+
+    def get(self, h):
+        """h の中身 (消えていれば None)"""
+        if not self.alive(h):
+            return None
+        return self._items[self._pos[h & SLOT_MASK]]
+
+    def remove(self, h):
+        """h を消す (位置に印を付けるだけ。詰めるのは compact())。すでに消えていれば False"""
+        slot = h & SLOT_MASK
+        if slot >= len(self._gen) or self._gen[slot] != h >> SLOT_BITS:
+            return False
+        self._gen[slot] += 1
+        self._free.append(slot)
+        p = self._pos[slot]
+        self._items[p] = None
+        self._live[p] = 0
+        self._dead += 1
+        return True
+
+    def compact(self):
+        """消した所を詰める (並び順はそのまま)。消したものがなければ何もしない"""
+        if not self._dead:
+            return
+        live = self._live
+        items = self._items = list(compress(self._items, live))
+        handles = self._handles = list(compress(self._handles, live))
+        self._live = [1] * len(items)
+        self._dead = 0
+        pos = self._pos
+        for p, h in enumerate(handles):
+            pos[h & SLOT_MASK] = p
+
+    def clear(self):
+        for h in compress(self._handles, self._live):
+            slot = h & SLOT_MASK
+            self._gen[slot] += 1
+            self._free.append(slot)
+        self._items.clear()
+        self._handles.clear()
+        self._live.clear()
+        self._dead = 0
@@ -0,0 +1,89 @@
+# attract.py
+# STAR SHOTTER のタイトル背景 (アトラクトモード) のデモデータ
+# 実際のタイトル画面で動いた敵と地上物の位置を1回の更新ごとに記録しておき、タイトル画面ではそれを
+# 順に描くだけにする (敵の出現・移動・当たり判定を回さない)。1回の更新で描く数は MAX_PER_FRAME まで。
+# pyxel には依存しない。
+#
+# ファイル形式:
+#   ヘッダ  "SSA1", 更新回数 (u32, リトルエンディアン)
+#   本体    更新ごとに 個数 (u8) と (種類 u8, x + OFFSET u8, y + OFFSET u8) × 個数 を並べて zlib で圧縮したもの
+
+import struct
+import zlib
+from array import array
+
+MAGIC = b"SSA1"
+HEADER = struct.Struct("<4sI")
+OFFSET = 32            # 画面外 (x, y < 0) も u8 に入れるためのずらし
+MAX_PER_FRAME = 48
+
+# 種類
+ENEMY_TYPES = ("sotta", "kappa", "calderon")   # 0〜2 は敵の kind (種類の番号) と同じ
+KIND_GROUND = 3
+
+
+def _u8(v):
+    return max(0, min(255, int(v) + OFFSET))
+
+
+class AttractRecorder:
+    """更新ごとに record(enemies, ground_targets) を呼んで位置を貯める"""
+
+    def __init__(self):
+        self.frames = 0
+        self.data = bytearray()
+
+    def record(self, enemies, ground_targets):
+        ents = [(KIND_GROUND, g["x"], g["y"]) for g in ground_targets]
+        ents += [(e["kind"], e["x"], e["y"]) for e in enemies]
+        ents = ents[:MAX_PER_FRAME]
+        self.data.append(len(ents))
+        for kind, x, y in ents:
+            self.data += bytes((kind, _u8(x), _u8(y)))
+        self.frames += 1
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, self.frames) + zlib.compress(bytes(self.data), 9)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class AttractDemo:
+    """読み込んだデモ: advance() で1更新進め、entities() で今の (種類, x, y) を返す。最後まで行くと先頭に戻る"""
+
+    def __init__(self, frames, data):
+        self.frames = frames
+        self.data = data
+        self.starts = array("I")     # 更新ごとの先頭位置
+        p = 0
+        for _ in range(frames):
+            self.starts.append(p)
+            p += 1 + data[p] * 3
+        self.index = 0
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, frames = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("デモファイルではありません")
+        return cls(frames, zlib.decompress(data[HEADER.size:]))
+
+    def advance(self):
+        self.index = (self.index + 1) % self.frames
+
+    def entities(self):
+        data = self.data
+        p = self.starts[self.index]
+        for q in range(p + 1, p + 1 + data[p] * 3, 3):
+            yield data[q], data[q + 1] - OFFSET, data[q + 2] - OFFSET
+
+
+def load_attract(path):
+    """path のデモを読む (なければ None)"""
+    try:
+        with open(path, "rb") as f:
+            return AttractDemo.from_bytes(f.read())
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,105 @@
+# bench_arena.py
+# STAR SHOTTER の update_entities と同じ形のループで、リストのコピー + list.remove と Arena を比べるベンチマーク
+# Arena 側はゲームと同じく、回の初めに compact() し、最後に描画の代わりに中身を順に回す
+# 使い方: python bench_arena.py [--ticks 300]
+
+import argparse
+import random
+import time
+
+from arena import Arena
+
+W, H = 160, 120
+
+
+def spawn_shot(rng):
+    return [rng.uniform(0, W), rng.uniform(0, H), rng.uniform(-4, -2)]
+
+
+def spawn_enemy(rng):
+    return {"x": rng.uniform(0, W), "y": rng.uniform(0, H), "vy": rng.uniform(0.5, 1.5)}
+
+
+def draw(shots, enemies):
+    # 描画のループ (座標を読むだけ)
+    n = 0
+    for s in shots: n += s[1] > 0
+    for e in enemies: n += e["y"] > 0
+    return n
+
+
+def tick_list(shots, enemies, rng, count):
+    # 元の書き方: コピーを回して in で確かめてから remove
+    for s in shots[:]:
+        s[1] += s[2]
+        if s[1] < -10:
+            if s in shots: shots.remove(s)
+    hits = 0
+    for e in enemies[:]:
+        e["y"] += e["vy"]
+        for s in shots[:]:
+            if abs(e["x"]-s[0]) < 6 and abs(e["y"]-s[1]) < 6:
+                if e in enemies: enemies.remove(e)
+                if s in shots: shots.remove(s)
+                hits += 1
+                break
+        if e["y"] > H:
+            if e in enemies: enemies.remove(e)
+    while len(shots) < count: shots.append(spawn_shot(rng))
+    while len(enemies) < count: enemies.append(spawn_enemy(rng))
+    draw(shots, enemies)
+    return hits
+
+
+def tick_arena(shots, enemies, rng, count):
+    shots.compact(); enemies.compact()
+    for sh, s in shots.items():
+        s[1] += s[2]
+        if s[1] < -10: shots.remove(sh)
+    hits = 0
+    for eh, e in enemies.items():
+        e["y"] += e["vy"]
+        for sh, s in shots.items():
+            if abs(e["x"]-s[0]) < 6 and abs(e["y"]-s[1]) < 6:
+                enemies.remove(eh); shots.remove(sh)
+                hits += 1
+                break
+        if e["y"] > H: enemies.remove(eh)
+    while len(shots) < count: shots.add(spawn_shot(rng))
+    while len(enemies) < count: enemies.add(spawn_enemy(rng))
+    draw(shots, enemies)
+    return hits
+
+
+def run(count, ticks, seed):
+    results = []
+    for use_arena in (False, True):
+        # どちらの方式も同じ配置から始める
+        rng = random.Random(seed)
+        shots = Arena() if use_arena else []
+        enemies = Arena() if use_arena else []
+        tick = tick_arena if use_arena else tick_list
+        tick(shots, enemies, rng, count)
+        hits_total = 0
+        start = time.perf_counter()
+        for _ in range(ticks):
+            hits_total += tick(shots, enemies, rng, count)
+        elapsed = time.perf_counter() - start
+        results.append((hits_total, elapsed / ticks * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arena の削除を list.remove と比較する")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'entities':>8} | {'list ms/tick':>12} | {'arena ms/tick':>13} | {'speedup':>7} | hits/tick")
+    for count in (50, 200, 1000):
+        (lh, lt), (ah, at) = run(count, args.ticks, args.seed)
+        print(f"{count:>8} | {lt:>12.3f} | {at:>13.3f} | {lt / at:>6.2f}x | {lh / args.ticks:.1f} / {ah / args.ticks:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_spatial_hash.py
+# 自機弾 vs 敵 の判定を総当たりと空間ハッシュで比べるベンチマーク
+# 使い方: python bench_spatial_hash.py [--ticks 300]
+
+import argparse
+import random
+import time
+
+from spatial_hash import SpatialHash
+from hypershot_core import (
+    SCREEN_W, PLAYABLE_AREA_TOP, PLAYABLE_AREA_BOTTOM, PLAYABLE_H_EFFECTIVE,
+    PLAYER_BULLET_W, PLAYER_BULLET_H, GRID_CELL, GROUP_PLAYER_BULLET, GROUP_ENEMY,
+    Enemy,
+)
+
+HALF = Enemy.SIZE // 2
+
+
+class Body:
+    def __init__(self, rng):
+        self.x = rng.uniform(0, SCREEN_W)
+        self.y = rng.uniform(PLAYABLE_AREA_TOP, PLAYABLE_AREA_BOTTOM)
+
+
+def overlaps(b, e):
+    return (b.x + PLAYER_BULLET_W >= e.x - HALF and b.x <= e.x + HALF and
+            b.y + PLAYER_BULLET_H//2 >= e.y - HALF and b.y - PLAYER_BULLET_H//2 <= e.y + HALF)
+
+
+def brute_force(bullets, enemies):
+    hits = 0
+    for e in enemies:
+        for b in bullets:
+            if overlaps(b, e):
+                hits += 1
+    return hits, len(bullets) * len(enemies)
+
+
+def hashed(grid, bullets, enemies):
+    grid.clear()
+    for b in bullets:
+        grid.insert(b, b.x, b.y - PLAYER_BULLET_H//2, b.x + PLAYER_BULLET_W, b.y + PLAYER_BULLET_H//2, GROUP_PLAYER_BULLET)
+    for e in enemies:
+        grid.insert(e, e.x - HALF, e.y - HALF, e.x + HALF, e.y + HALF, GROUP_ENEMY)
+    hits = 0
+    for b, e in grid.pairs(GROUP_PLAYER_BULLET, GROUP_ENEMY):
+        if overlaps(b, e):
+            hits += 1
+    return hits, grid.pair_count
+
+
+def run(count, ticks, seed):
+    grid = SpatialHash(0, PLAYABLE_AREA_TOP, SCREEN_W, PLAYABLE_H_EFFECTIVE, cell=GRID_CELL)
+
+    results = []
+    for use_grid in (False, True):
+        # どちらの方式も同じ配置から始める
+        rng = random.Random(seed)
+        bullets = [Body(rng) for _ in range(count)]
+        enemies = [Body(rng) for _ in range(count)]
+        if use_grid:
+            func, args = hashed, (grid, bullets, enemies)
+        else:
+            func, args = brute_force, (bullets, enemies)
+        pairs_total = 0
+        hits_total = 0
+        start = time.perf_counter()
+        for _ in range(ticks):
+            for b in bullets:
+                b.x = (b.x + 4) % SCREEN_W
+            for e in enemies:
+                e.x = (e.x - 1) % SCREEN_W
+            hits, pairs = func(*args)
+            hits_total += hits
+            pairs_total += pairs
+        elapsed = time.perf_counter() - start
+        results.append((pairs_total / ticks, hits_total, elapsed / ticks * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="空間ハッシュのブロードフェーズを総当たりと比較する")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'entities':>8} | {'brute pairs':>11} {'ms/tick':>8} | {'grid pairs':>10} {'ms/tick':>8} | hits")
+    for count in (10, 25, 50, 100, 200, 400):
+        (bp, bh, bt), (gp, gh, gt) = run(count, args.ticks, args.seed)
+        assert bh == gh, "ブロードフェーズで当たりを取りこぼした"
+        print(f"{count:>8} | {bp:>11.0f} {bt:>8.3f} | {gp:>10.1f} {gt:>8.3f} | {gh // args.ticks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bullet_store.py
+# 敵弾を「列ごとの配列 (Struct of Arrays)」で持つ弾ストア
+# 移動・画面外の削除・自機との当たり判定をすべて NumPy の一括演算で行う。
+# pyxel には依存しない (Web 版では Pyodide の numpy パッケージを使う)。
+
+import numpy as np
+
+# 弾の種類 (type 列)
+BT_NORMAL = 0
+
+# 弾の持ち主 (owner 列)
+OWNER_ENEMY = 0   # 雑魚敵の弾、または撃ったボスが倒された後の弾
+OWNER_BOSS = 1
+
+
+class BulletStore:
+    """位置・速度・種類・持ち主の列を持つ敵弾ストア
+
+    有効な弾は常に先頭 count 個に詰めて持つ。削除は残す弾だけを前に詰め直すので
+    弾の順番は変わらない。容量が足りなくなったら倍に広げる。
+    """
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        n = self.count
+        old = getattr(self, "x", None)
+        self.capacity = capacity
+        x = np.zeros(capacity)
+        y = np.zeros(capacity)
+        dx = np.zeros(capacity)
+        dy = np.zeros(capacity)
+        kind = np.zeros(capacity, dtype=np.int8)
+        owner = np.zeros(capacity, dtype=np.int8)
+        if old is not None and n:
+            x[:n] = self.x[:n]
+            y[:n] = self.y[:n]
+            dx[:n] = self.dx[:n]
+            dy[:n] = self.dy[:n]
+            kind[:n] = self.type[:n]
+            owner[:n] = self.owner[:n]
+        self.x, self.y, self.dx, self.dy = x, y, dx, dy
+        self.type, self.owner = kind, owner
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, x, y, dx, dy, type=BT_NORMAL, owner=OWNER_ENEMY):
+        i = self.count
+        if i >= self.capacity:
+            self._alloc(self.capacity * 2)
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.type[i] = type
+        self.owner[i] = owner
+        self.count = i + 1
+
+    def spawn_batch(self, x, y, dx, dy, type=BT_NORMAL, owner=OWNER_ENEMY):
+        """複数の弾を一度に追加する (引数は配列またはスカラー、長さは dx に合わせる)"""
+        dx = np.asarray(dx, dtype=float)
+        k = dx.size
+        if k == 0:
+            return
+        n = self.count
+        if n + k > self.capacity:
+            cap = self.capacity
+            while cap < n + k:
+                cap *= 2
+            self._alloc(cap)
+        self.x[n:n + k] = x
+        self.y[n:n + k] = y
+        self.dx[n:n + k] = dx
+        self.dy[n:n + k] = dy
+        self.type[n:n + k] = type
+        self.owner[n:n + k] = owner
+        self.count = n + k
+
+    def step(self, owner=None):
+        """弾を1フレーム進める (owner を指定するとその持ち主の弾だけ)"""
+        n = self.count
+        if n == 0:
+            return
+        if owner is None:
+            self.x[:n] += self.dx[:n]
+            self.y[:n] += self.dy[:n]
+        else:
+            m = self.owner[:n] == owner
+            self.x[:n][m] += self.dx[:n][m]
+            self.y[:n][m] += self.dy[:n][m]
+
+    def _keep(self, keep):
+        n = self.count
+        k = int(np.count_nonzero(keep))
+        if k == n:
+            return
+        for col in (self.x, self.y, self.dx, self.dy, self.type, self.owner):
+            col[:k] = col[:n][keep]
+        self.count = k
+
+    def cull(self, x0, y0, x1, y1):
+        """範囲 (x0, y0)-(x1, y1) の外に出た弾を消す"""
+        n = self.count
+        if n == 0:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        self._keep((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1))
+
+    def hit_test(self, px, py, r, ry=None):
+        """(px, py) から横 r・縦 ry (省略時は r) 未満に入った弾を消し、その数を返す"""
+        n = self.count
+        if n == 0:
+            return 0
+        if ry is None:
+            ry = r
+        hit = (np.abs(self.x[:n] - px) < r) & (np.abs(self.y[:n] - py) < ry)
+        hits = int(np.count_nonzero(hit))
+        if hits:
+            self._keep(~hit)
+        return hits
+
+    def take_hits(self, tx, ty, rx, ry):
+        """的 (tx[i], ty[i]) ごとに、横 rx・縦 ry 未満に入った弾を先頭から1発だけ消す
+
+        的は並び順に処理し、前の的が消した弾は後の的には当たらない。的ごとに当たったかの bool 配列を返す。
+        """
+        k = len(tx)
+        hit = np.zeros(k, dtype=bool)
+        n = self.count
+        if n == 0 or k == 0:
+            return hit
+        tx = np.asarray(tx, dtype=float)
+        ty = np.asarray(ty, dtype=float)
+        m = (np.abs(self.x[:n] - tx[:, None]) < rx) & (np.abs(self.y[:n] - ty[:, None]) < ry)
+        rows = np.flatnonzero(m.any(axis=1))
+        if rows.size:
+            keep = np.ones(n, dtype=bool)
+            for i in rows.tolist():
+                live = m[i] & keep
+                j = int(live.argmax())
+                if live[j]:
+                    keep[j] = False
+                    hit[i] = True
+            self._keep(keep)
+        return hit
+
+    def set_owner(self, owner, mask=None):
+        n = self.count
+        if mask is None:
+            self.owner[:n] = owner
+        else:
+            self.owner[:n][mask] = owner
+
+    def positions(self):
+        """描画用: 有効な弾の (x, y) を Python のリストで返す"""
+        n = self.count
+        return list(zip(self.x[:n].tolist(), self.y[:n].tolist()))
@@ -0,0 +1,75 @@
+# fire_control.py
+# 自機の連射の管理と、ボタンを押してから弾が出るまでの遅れの計測
+# FireControl: クールダウン式の連射。押した更新で1発目を撃ち、押し続ける間は interval ごとに撃つ
+#   (frame_count % interval のような全体のカウンタに合わせないので、押した瞬間に最大 interval-1 待たされない)。
+# LatencyProbe: 押した更新から最初の弾が出た更新までの数を数える。既存の発射の仕組みはそのままで、
+#   押されているかを毎回 tick() に、弾を出したときに spawned() を呼ぶだけで使える。
+# pyxel には依存しない。
+
+from collections import deque
+
+
+class FireControl:
+    """クールダウン式の連射"""
+
+    def __init__(self):
+        self.cooldown = 0
+
+    def reset(self):
+        self.cooldown = 0
+
+    def update(self, held, interval):
+        """1回の更新ごとに呼ぶ。このとき撃つなら True"""
+        if self.cooldown > 0:
+            self.cooldown -= 1
+        if held and self.cooldown == 0:
+            self.cooldown = interval
+            return True
+        return False
+
+
+class LatencyProbe:
+    """ショットボタンを押してから最初の弾が出るまでの更新回数 (0 なら同じ更新で出た)
+
+    last は直近の値、samples は直近 window 回分。count / max は起動してからの合計。
+    """
+
+    def __init__(self, window=64):
+        self.frame = 0
+        self.samples = deque(maxlen=window)
+        self.last = None
+        self.count = 0
+        self.max = 0
+        self._held = False
+        self._pressed_at = None
+
+    def tick(self, held):
+        """1回の更新ごとに、その更新で弾を出す処理より前に呼ぶ"""
+        self.frame += 1
+        held = bool(held)
+        if held and not self._held:
+            self._pressed_at = self.frame
+        elif not held:
+            self._pressed_at = None
+        self._held = held
+
+    def spawned(self):
+        """弾を出したときに呼ぶ (押してから最初の1回だけ数える)"""
+        if self._pressed_at is None:
+            return
+        lat = self.frame - self._pressed_at
+        self._pressed_at = None
+        self.last = lat
+        self.samples.append(lat)
+        self.count += 1
+        self.max = max(self.max, lat)
+
+    def average(self):
+        n = len(self.samples)
+        return sum(self.samples) / n if n else 0.0
+
+    def label(self):
+        """画面表示用の1行"""
+        if self.last is None:
+            return "LAT --"
+        return f"LAT {self.last} AVG {self.average():.1f} MAX {self.max}"
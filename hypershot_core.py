@@ -0,0 +1,1094 @@
+# hypershot_core.py
+# HYPER SHOOTER 2026 のゲームルール (pyxel 非依存)
+# 描画・サウンド出力・入力デバイスの読み取りは hypershotterKON2026.py 側で行う。
+# このモジュール単体でウィンドウなしに実時間より高速でゲームを進められる。
+
+import os
+import random
+import zlib
+
+from spatial_hash import SpatialHash
+from bullet_store import BulletStore, OWNER_ENEMY, OWNER_BOSS
+from particles import ParticlePool
+from object_pool import ObjectPool
+from profiler import FrameProfiler
+from fire_control import LatencyProbe
+from path_history import PathHistory
+from timer_wheel import TimerWheel
+from spawn_timeline import PATTERNS, SpawnQueue, compile_timeline, every
+from stage_data import StageLoader
+from trail import Trail
+from trig_table import SwayCurve, aim
+
+
+# --- 定数 ---
+SCREEN_W = 160
+SCREEN_H = 120
+PLAYER_BULLET_W = 6
+PLAYER_BULLET_H = 2
+
+# UIエリア設定
+UI_HEIGHT = 16
+UI_Y_START = SCREEN_H - UI_HEIGHT
+TOP_UI_HEIGHT = 20
+PLAYABLE_AREA_TOP = TOP_UI_HEIGHT
+PLAYABLE_AREA_BOTTOM = UI_Y_START
+PLAYABLE_H_EFFECTIVE = PLAYABLE_AREA_BOTTOM - PLAYABLE_AREA_TOP
+
+# グラフィック/ゲームプレイ関連
+LIFE_ICON_SIZE = 6  # ハートアイコンのサイズ
+POWER_UP_NAMES = ["SPEED", "MSL", "DUAL", "LASER", "OPTION", "SHIELD"]
+METER_ITEM_WIDTH = 25
+MAX_POWER_LEVEL = 3
+OPTION_DELAY = 14        # オプションどうしの間隔 (自機が動いた更新の数)
+OPTION_SLOTS = 4         # 道の記録はオプション4つ分まで持つ
+MAX_OPTIONS = 2          # パワーアップで付くオプションの数 (OPTION_SLOTS まで増やせる)
+EXHAUST_LIFE = 8         # 噴射炎の粒が消えるまでの更新数 (毎フレーム出すので Trail の長さも同じ)
+OPTION_EXHAUST_LIFE = 5
+
+# ボスHPゲージの位置
+HP_BAR_W = 50
+BOSS_LABEL_X = 95
+BOSS_HP_X = 90
+BOSS_HP_Y = 10
+
+# UI表示位置
+SCORE_Y = 2    # SCORE/LIFE/STAGE/BOSS HP ラベル (上段)
+LIFE_Y = 10    # スコア値/ライフハート/ステージ番号/HPゲージ (下段)
+STAGE_Y = 2
+LOOP_Y = 10
+
+# スコア定数
+SCORE_FIGHTER = 10
+SCORE_WAVER = 30
+SCORE_TURRET = 50
+SCORE_BOSS = 500
+
+# ステージ情報 (ステージごとの出現表・ボス・背景色・BGM は stages/hypershot/stageN.json)
+STAGE_CLEAR_WAIT = 60
+END_CREDIT_TIME = 180
+
+# --- 入力ビット (1フレーム分の押下状態を1つの整数で表す) ---
+BTN_UP = 1 << 0
+BTN_DOWN = 1 << 1
+BTN_LEFT = 1 << 2
+BTN_RIGHT = 1 << 3
+BTN_SHOT = 1 << 4      # Z / パッドY
+BTN_SPACE = 1 << 5     # SPACE (パワーアップ決定・タイトル開始)
+BTN_PAD_A = 1 << 6     # パッドA (パワーアップ決定)
+BTN_START = 1 << 7     # パッドSTART
+BTN_RESTART = 1 << 8   # R
+
+# 衝突インデックスのグループ
+GROUP_PLAYER_BULLET = 0
+GROUP_ENEMY = 1
+GRID_CELL = 16
+
+# 敵弾の生存範囲 (画面外にこれだけ出たら消える)
+BULLET_MARGIN = 10
+ENEMY_BULLET_SPEED = 1.5
+
+# 乱数の系統: Game のシードから系統ごとに独立した乱数列を作る
+# (演出の乱数を増減しても出現位置やドロップの並びが変わらない)
+RNG_SPAWN = 0      # 敵の出現位置
+RNG_DROP = 1       # カプセルのドロップ判定
+RNG_FX = 2         # 噴射炎のゆらぎ
+RNG_PARTICLES = 3  # 爆発パーティクル
+RNG_STREAMS = 4
+
+# ステージデータのファイル (stage_data.StageLoader が stage{n+1}.json を1度だけ読んで StageData にする)
+STAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stages", "hypershot")
+BOSS_PATTERNS = ("slow", "spread")
+
+# プロファイラの区間 (Game.update の処理の順) と個数
+PROFILE_SECTIONS = ("scene", "spawn", "player", "enemies", "collide", "items", "particles",
+                    "boss", "body", "enemy_bullets")
+PROFILE_COUNTS = ("enemies", "player_bullets", "enemy_bullets", "items", "particles", "shot_latency",
+                  "timers", "timers_due")
+
+# 撃ち直し・出現の間隔 (更新の数)。待ち時間は Game.timers (timer_wheel.TimerWheel) に予約する
+TURRET_SHOT_INTERVAL = 90
+BOSS_SHOT_INTERVAL = 30
+
+# 爆発パーティクル (size_mult=1 で20粒、速さ 0.5〜1.5)
+PARTICLE_CAPACITY = 512
+EXPLOSION_PARTICLES = 20
+
+
+# -------------------- ステージデータ (StageData) --------------------
+class StageData:
+    """stageN.json を読み込み時に変換した形 (出現表はヒープにしてある)"""
+
+    def __init__(self, bg, bgm, spawns, boss_time, boss_hp, boss_hp_per_loop, boss_pattern, boss_pattern_interval):
+        self.bg = bg
+        self.bgm = bgm
+        self.spawns = spawns
+        self.boss_time = boss_time
+        self.boss_hp = boss_hp
+        self.boss_hp_per_loop = boss_hp_per_loop
+        self.boss_pattern = boss_pattern
+        self.boss_pattern_interval = boss_pattern_interval
+
+
+def compile_stage(raw):
+    """stageN.json の中身を StageData にする
+
+    spawns の1件は {"every": [start, stop, step], "type": ...} か {"frame": n, "type": ...}。
+    どちらも "y" (省略すると出現時に乱数) と "pattern" (省略すると "single") を書ける。
+    "type" は register_enemy_type() した敵の名前で、ここで種類の番号にしておく。
+    """
+    events = []
+    for spawn in raw["spawns"]:
+        kind = ENEMY_TYPE_IDS.get(spawn["type"])
+        if kind is None:
+            raise ValueError(f"unknown enemy type: {spawn['type']}")
+        y = spawn.get("y")
+        pattern = spawn.get("pattern", "single")
+        if "every" in spawn:
+            events += every(*spawn["every"], kind, y, pattern)
+        else:
+            events.append((spawn["frame"], kind, y, pattern))
+    boss = raw["boss"]
+    if boss["pattern"] not in BOSS_PATTERNS:
+        raise ValueError(f"unknown boss pattern: {boss['pattern']}")
+    return StageData(raw["bg"], raw["bgm"], compile_timeline(events), boss["time"], boss["hp"],
+                     boss["hp_per_loop"], boss["pattern"], boss["pattern_interval"])
+
+
+STAGES = StageLoader(STAGE_DIR, compile_stage)
+
+
+# -------------------- サウンド出力 (Audio) --------------------
+class NullAudio:
+    """ヘッドレス実行用: サウンド命令をすべて捨てる"""
+    def play(self, ch, snd):
+        pass
+
+    def playm(self, msc, loop=False):
+        pass
+
+    def stop(self):
+        pass
+
+
+# -------------------- 弾 (Bullet) --------------------
+# 自機弾の種類 (Bullet.kind)。種類ごとの弾をまとめて SHOT_KERNELS[kind] で動かす
+SHOT_NORMAL, SHOT_DUAL, SHOT_MSL, SHOT_LASER = range(4)
+
+
+class Bullet:
+    def __init__(self, x, y, kind=SHOT_NORMAL, dx=2, dy=0, color=7, is_player=False):
+        self.reset(x, y, kind, dx, dy, color, is_player)
+
+    def reset(self, x, y, kind=SHOT_NORMAL, dx=2, dy=0, color=7, is_player=False):
+        """プールから再利用するときの初期化 (__init__ と同じ引数)"""
+        self.x = float(x)
+        self.y = float(y)
+        self.kind = kind
+        self.dx = float(dx)
+        self.dy = float(dy)
+
+        if not is_player:
+            self.color = 9  # オレンジ (ボス/敵弾)
+            self.size = 2
+        else:
+            self.color = color
+            self.size = 1
+
+        self.active = True
+        self.is_player = is_player
+        self.is_piercing = (kind == SHOT_LASER)
+
+
+def move_shots(batch):
+    """まっすぐ飛ぶ弾 (NORMAL / DUAL / LASER)"""
+    for b in batch:
+        b.x += b.dx
+        b.y += b.dy
+        if b.x < -10 or b.x > SCREEN_W + 10 or b.y < -10 or b.y > SCREEN_H + 10:
+            b.active = False
+
+
+def move_missiles(batch):
+    """MSL: 落ちる速さを 3 まで増やしながら飛ぶ"""
+    for b in batch:
+        b.dy = min(b.dy + 0.15, 3)
+        b.x += b.dx
+        b.y += b.dy
+        if b.x < -10 or b.x > SCREEN_W + 10 or b.y < -10 or b.y > SCREEN_H + 10:
+            b.active = False
+
+
+SHOT_KERNELS = (move_shots, move_shots, move_missiles, move_shots)
+
+BULLET_POOL = ObjectPool(Bullet)
+
+
+# -------------------- パワーアップカプセル (PowerUp) --------------------
+class PowerUp:
+    def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+        self.active = True
+        self.anim = 0
+
+    def update(self):
+        self.x -= 1
+        self.anim = (self.anim + 1) % 10
+        if self.x < -5:
+            self.active = False
+
+
+POWERUP_POOL = ObjectPool(PowerUp)
+
+
+# -------------------- プレイヤー (Player) --------------------
+class Player:
+    SIZE = 8
+    SHIP_COLOR = 12
+
+    def __init__(self, audio=None, rng=None, timers=None):
+        """timers: Game のタイマー (渡さなければ自分の分を作って update で進める)"""
+        self.audio = audio or NullAudio()
+        self.rng = rng or random
+        self.own_timers = timers is None
+        self.timers = TimerWheel() if timers is None else timers
+        self.x = 20.0
+        self.y = PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE//2
+        self.life = 3
+        self.bullets = []                                   # 撃った順 (当たり判定はこの順)
+        self.shot_batches = [[] for _ in SHOT_KERNELS]      # 種類ごと (移動と描画はこの単位)
+        self.anim = 0
+        self.exhaust = Trail(EXHAUST_LIFE, EXHAUST_LIFE)
+        self.option_exhaust = [Trail(OPTION_EXHAUST_LIFE, OPTION_EXHAUST_LIFE) for _ in range(OPTION_SLOTS)]
+
+        self.meter_index = -1
+        self.power_levels = {
+            "SPEED": 0, "MSL": 0, "DUAL": 0,
+            "LASER": 0, "OPTION": 0, "SHIELD": 0
+        }
+        self.options = []
+        self.option_slots = [[self.x, self.y] for _ in range(OPTION_SLOTS)]
+        self.path = PathHistory(OPTION_DELAY * OPTION_SLOTS + 1, self.x, self.y)
+        self.shot_ready = True
+        self.fire_probe = LatencyProbe()
+
+    def update(self, held, pressed):
+        """held: 押されているボタン, pressed: このフレームで押されたボタン"""
+        self.anim = (self.anim + 1) % 20
+        if self.own_timers:
+            self.timers.advance()
+
+        base_speed = 1.0 + self.power_levels["SPEED"] * 0.5
+        dx, dy = 0.0, 0.0
+        if held & BTN_UP: dy = -base_speed
+        if held & BTN_DOWN: dy = base_speed
+        if held & BTN_LEFT: dx = -base_speed
+        if held & BTN_RIGHT: dx = base_speed
+
+        self.x = max(Player.SIZE, min(SCREEN_W - Player.SIZE, self.x + dx))
+
+        min_y = PLAYABLE_AREA_TOP + Player.SIZE
+        max_y = PLAYABLE_AREA_BOTTOM - Player.SIZE
+        self.y = max(min_y, min(max_y, self.y + dy))
+
+        if pressed & (BTN_SPACE | BTN_PAD_A) and self.meter_index != -1:
+            self.activate_power_up(self.meter_index)
+            self.meter_index = -1
+            self.audio.play(0, 5)
+
+        self.fire_probe.tick(held & BTN_SHOT)
+        if held & BTN_SHOT and self.shot_ready:
+            self.fire_shots()
+
+        self.update_options()
+        for kernel, batch in zip(SHOT_KERNELS, self.shot_batches):
+            kernel(batch)
+        if BULLET_POOL.sweep(self.bullets):
+            for batch in self.shot_batches:
+                batch[:] = [b for b in batch if b.active]
+
+        self.exhaust.emit(self.x - 8, self.y)
+        self.exhaust.step(-1, self.exhaust_jitter)
+        # オプションの噴射炎 (オプションが消えても出した粒は消えるまで流れる)
+        for trail, (ox, oy) in zip(self.option_exhaust, self.options):
+            trail.emit(ox - 4, oy)
+        for trail in self.option_exhaust:
+            trail.step(-1, self.exhaust_jitter)
+
+    def exhaust_jitter(self):
+        """噴射炎の粒ごとのゆらぎ (後ろへ 0〜0.5、上下へ ±0.5)"""
+        return -self.rng.uniform(0, 0.5), self.rng.uniform(-0.5, 0.5)
+
+    def reload(self):
+        self.shot_ready = True
+
+    def acquire_capsule(self):
+        if self.meter_index == -1:
+            self.meter_index = 0
+        else:
+            self.meter_index = (self.meter_index + 1) % len(POWER_UP_NAMES)
+
+        self.audio.play(0, 1)
+
+    def update_options(self):
+        """オプションは自機の通った道を OPTION_DELAY 回ずつ遅れてなぞる (自機が止まるとその場で止まる)
+
+        options は option_slots の先頭から数ぶんを指す [x, y] のリストで、中身をその場で書き換える。
+        """
+        current_options = self.power_levels["OPTION"]
+        if len(self.options) != current_options:
+            self.options = self.option_slots[:current_options]
+
+        path = self.path
+        path.record(self.x, self.y)
+        delay = 0
+        for slot in self.options:
+            delay += OPTION_DELAY
+            path.sample_into(slot, delay)
+
+    def fire_shots(self):
+        self.shot_ready = False
+        self.timers.schedule(10 if self.power_levels["LASER"] > 0 or self.power_levels["DUAL"] > 0 else 5, self.reload)
+        self.fire_probe.spawned()
+
+        fire_points = [(self.x + 6, self.y)] + self.options
+
+        for fx, fy in fire_points:
+            if self.power_levels["MSL"] > 0:
+                self.add_shot(fx, fy, SHOT_MSL, 3, 0, 8)
+
+            if self.power_levels["LASER"] > 0:
+                self.add_shot(fx, fy, SHOT_LASER, 4, 0, 10)
+            elif self.power_levels["DUAL"] > 0:
+                self.add_shot(fx, fy, SHOT_DUAL, 4, -1, 11)
+                self.add_shot(fx, fy, SHOT_DUAL, 4, 1, 11)
+            else:
+                self.add_shot(fx, fy, SHOT_NORMAL, 4, 0, 11)
+
+        self.audio.play(0, 0)
+
+    def release_shots(self):
+        """自機弾をすべてプールに返す"""
+        BULLET_POOL.release_all(self.bullets)
+        for batch in self.shot_batches:
+            batch.clear()
+
+    def add_shot(self, x, y, kind, dx, dy, color):
+        b = BULLET_POOL.acquire(x, y, kind, dx, dy, color, is_player=True)
+        self.bullets.append(b)
+        self.shot_batches[kind].append(b)
+
+    def activate_power_up(self, index):
+        name = POWER_UP_NAMES[index]
+        if name == "SPEED":
+            if self.power_levels["SPEED"] < MAX_POWER_LEVEL:
+                self.power_levels["SPEED"] += 1
+        elif name == "MSL":
+            self.power_levels["MSL"] = 1
+        elif name == "DUAL":
+            self.power_levels["DUAL"] = 1
+            self.power_levels["LASER"] = 0
+        elif name == "LASER":
+            self.power_levels["LASER"] = 1
+            self.power_levels["DUAL"] = 0
+        elif name == "OPTION":
+            if self.power_levels["OPTION"] < MAX_OPTIONS:
+                self.power_levels["OPTION"] += 1
+        elif name == "SHIELD":
+            self.power_levels["SHIELD"] = 3
+
+
+# -------------------- 敵 (Enemy) --------------------
+class Enemy:
+    SIZE = 6
+    SWAY = SwayCurve(0.15, 15)   # WAVER の上下の揺れ
+    def __init__(self, x, y, loop_count, stage, kind, timers=None):
+        """kind: 敵の種類の番号 (register_enemy_type の戻り値)、timers: 撃つ時刻を予約する Game のタイマー"""
+        t = ENEMY_TYPES[kind]
+        self.x = float(x)
+        self.y = float(y)
+        self.initial_y = float(y)
+        self.kind = kind
+        enemy_color_offset = stage % 5
+        self.color = 8 + enemy_color_offset
+        self.active = True
+        self.wave_timer = 0
+        self.shot_ready = False
+
+        self.base_hp = t.base_hp
+        self.score_value = t.score_value
+        self.speed_multiplier = t.speed + loop_count * t.speed_per_loop
+        self.speed = t.step * self.speed_multiplier   # 1回の更新で左へ進む量
+        self.hp = self.base_hp + loop_count * 0.5
+        self.anim = 0
+
+        self.timers = timers
+        if t.on_spawn is not None and timers is not None:
+            t.on_spawn(self, timers)
+
+    def arm(self):
+        # 次の予約は撃ったときにする (リストから外れた敵は撃たないので、予約もそこで終わる)
+        self.shot_ready = True
+
+    def fire_to_player(self, px, py):
+        """自機狙い弾の (x, y, dx, dy) を返す"""
+        dx, dy = aim(px - self.x, py - self.y, ENEMY_BULLET_SPEED)
+        return (self.x, self.y, dx, dy)
+
+
+# -------------------- 敵の種類 (EnemyType) --------------------
+# 敵は種類ごとのリスト (Game.enemy_batches[kind]) に分けておき、種類ごとの kernel でまとめて動かす。
+# kernel(batch, px, py, bullets, owner) は batch の敵を1回分動かし、撃つ弾は bullets に owner で追加する。
+# 新しい種類は register_enemy_type() で足せばよく、更新のループに分岐を足す必要はない。
+class EnemyType:
+    def __init__(self, kind, name, base_hp, score_value, speed, speed_per_loop, step, kernel, on_spawn=None):
+        self.kind = kind
+        self.name = name
+        self.base_hp = base_hp
+        self.score_value = score_value
+        self.speed = speed                  # 速さの倍率 (1周目)
+        self.speed_per_loop = speed_per_loop
+        self.step = step                    # 倍率 1 のときに1回で左へ進む量
+        self.kernel = kernel
+        self.on_spawn = on_spawn            # on_spawn(enemy, timers): 生まれたときの予約など
+
+
+ENEMY_TYPES = []        # 番号順
+ENEMY_TYPE_IDS = {}     # 名前 (ステージデータの "type") → 番号
+
+
+def register_enemy_type(name, base_hp, score_value, speed, speed_per_loop, step, kernel, on_spawn=None):
+    """敵の種類を登録して番号を返す (Game を作る前、モジュールの読み込み時に呼ぶ)"""
+    kind = len(ENEMY_TYPES)
+    ENEMY_TYPES.append(EnemyType(kind, name, base_hp, score_value, speed, speed_per_loop, step, kernel, on_spawn))
+    ENEMY_TYPE_IDS[name] = kind
+    return kind
+
+
+ENEMY_MIN_Y = PLAYABLE_AREA_TOP + Enemy.SIZE
+ENEMY_MAX_Y = PLAYABLE_AREA_BOTTOM - Enemy.SIZE
+
+
+def update_fighters(batch, px, py, bullets, owner):
+    """FIGHTER: 左へまっすぐ進む"""
+    for e in batch:
+        e.anim = (e.anim + 1) % 20
+        e.wave_timer += 1
+        e.x -= e.speed
+        if e.x < -Enemy.SIZE:
+            e.active = False
+        e.y = max(ENEMY_MIN_Y, min(ENEMY_MAX_Y, e.y))
+
+
+def update_wavers(batch, px, py, bullets, owner):
+    """WAVER: 上下に揺れながら左へ進む"""
+    sway = Enemy.SWAY
+    for e in batch:
+        e.anim = (e.anim + 1) % 20
+        e.wave_timer += 1
+        e.x -= e.speed
+        e.y = e.initial_y + sway(e.wave_timer)
+        if e.x < -Enemy.SIZE:
+            e.active = False
+        e.y = max(ENEMY_MIN_Y, min(ENEMY_MAX_Y, e.y))
+
+
+def update_turrets(batch, px, py, bullets, owner):
+    """TURRET: ゆっくり進み、予約した回に自機を狙って撃つ"""
+    for e in batch:
+        e.anim = (e.anim + 1) % 20
+        e.wave_timer += 1
+        e.x -= e.speed
+        if e.shot_ready:
+            x, y, dx, dy = e.fire_to_player(px, py)
+            bullets.spawn(x, y, dx, dy, owner=owner)
+            e.shot_ready = False
+            e.timers.schedule(TURRET_SHOT_INTERVAL, e.arm)
+        if e.x < -Enemy.SIZE:
+            e.active = False
+        e.y = max(ENEMY_MIN_Y, min(ENEMY_MAX_Y, e.y))
+
+
+def arm_turret(e, timers):
+    # 初弾は SCREEN_W - 30 より左に入った回 (kernel と同じ引き算で数える。生まれた回の更新が1回目)
+    x, n = e.x, 0
+    while True:
+        x -= e.speed
+        n += 1
+        if x < SCREEN_W - 30:
+            break
+    timers.schedule(n - 1, e.arm)
+
+
+FIGHTER = register_enemy_type("FIGHTER", 1, SCORE_FIGHTER, 1.0, 0.1, 1, update_fighters)
+WAVER = register_enemy_type("WAVER", 1.5, SCORE_WAVER, 1.2, 0.1, 1.2, update_wavers)
+TURRET = register_enemy_type("TURRET", 2, SCORE_TURRET, 0.5, 0.05, 0.5, update_turrets, arm_turret)
+
+
+# -------------------- ボス (Boss) --------------------
+class Boss:
+    SIZE = 30
+    SWAY = SwayCurve(0.05, PLAYABLE_H_EFFECTIVE / 2 - SIZE)
+    def __init__(self, stage, loop_count, timers, data):
+        """timers: 弾を撃つ時刻を予約する Game のタイマー (生まれた回の update が1回目)、data: ステージの StageData"""
+        self.x = float(SCREEN_W - 50)
+        self.y = float(PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2 - Boss.SIZE // 2)
+        self.stage = stage
+        self.loop_count = loop_count
+        self.color = data.bg
+
+        self.base_hp = data.boss_hp
+        self.hp = self.base_hp + loop_count * data.boss_hp_per_loop
+        self.max_hp = self.hp
+
+        self.active = True
+        self.timer = 0
+        self.speed_multiplier = 1 + loop_count * 0.2
+        self.score_value = SCORE_BOSS
+
+        self.timers = timers
+        self.pattern = data.boss_pattern
+        self.pattern_interval = data.boss_pattern_interval
+        self.straight_ready = False
+        self.pattern_ready = False
+        timers.schedule(BOSS_SHOT_INTERVAL - 1, self.arm_straight)
+        timers.schedule(self.pattern_interval - 1, self.arm_pattern)
+
+    def arm_straight(self):
+        if self.active:
+            self.straight_ready = True
+            self.timers.schedule(BOSS_SHOT_INTERVAL, self.arm_straight)
+
+    def arm_pattern(self):
+        if self.active:
+            self.pattern_ready = True
+            self.timers.schedule(self.pattern_interval, self.arm_pattern)
+
+    def update(self, bullets):
+        """bullets: 敵弾ストア。ボスの弾は OWNER_BOSS で追加する"""
+        self.timer += 1
+
+        target_y = PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2 - Boss.SIZE // 2 + Boss.SWAY(self.timer)
+        self.y += (target_y - self.y) * 0.1
+
+        min_boss_y = PLAYABLE_AREA_TOP + 5
+        max_boss_y = PLAYABLE_AREA_BOTTOM - Boss.SIZE - 5
+        self.y = max(min_boss_y, min(max_boss_y, self.y))
+
+        if self.straight_ready:
+            self.straight_ready = False
+            bullets.spawn(self.x, self.y + 12, -2 * self.speed_multiplier, 0, owner=OWNER_BOSS)
+
+        if self.pattern_ready:
+            self.pattern_ready = False
+            if self.pattern == "spread":
+                bullets.spawn_batch(self.x, self.y + 12, [-2 * self.speed_multiplier] * 3,
+                                    [dy * self.speed_multiplier for dy in (-1, 0, 1)], owner=OWNER_BOSS)
+            else:
+                bullets.spawn(self.x, self.y + 12, -1 * self.speed_multiplier, 0.5, owner=OWNER_BOSS)
+
+        # ボスの近くにいる弾はボスの更新でも1回進む (旧 Boss.bullets の挙動)
+        bullets.step(OWNER_BOSS)
+        bullets.cull(-BULLET_MARGIN, -BULLET_MARGIN, SCREEN_W + BULLET_MARGIN, SCREEN_H + BULLET_MARGIN)
+
+
+# -------------------- ゲーム本体 (Game) --------------------
+class Game:
+    MAX_STAGE = 5
+
+    def __init__(self, audio=None, seed=None):
+        self.audio = audio or NullAudio()
+        # seed を省略したときは毎回違うシードを選ぶ (リプレイにはこの値を記録する)
+        self.seed = random.getrandbits(32) if seed is None else seed
+        base = self.seed * RNG_STREAMS
+        self.rng_spawn = random.Random(base + RNG_SPAWN)
+        self.rng_drop = random.Random(base + RNG_DROP)
+        self.rng_fx = random.Random(base + RNG_FX)
+        self.frame_count = 0
+        self.prev_held = 0
+        self.profiler = FrameProfiler()
+        self.profiler.declare(*PROFILE_SECTIONS)
+        self.profiler.declare_counts(*PROFILE_COUNTS)
+
+        self.loop_count = 0
+        self.mode = "TITLE"
+        self.grid = SpatialHash(0, PLAYABLE_AREA_TOP, SCREEN_W, PLAYABLE_H_EFFECTIVE, cell=GRID_CELL)
+        self.particles = ParticlePool(PARTICLE_CAPACITY, speed=(0.5, 1.5), life=(15, 30), colors=(8, 9, 10, 11),
+                                      seed=base + RNG_PARTICLES)
+
+        self.reset_game_state()
+
+        self.title_timer = 0
+        self.title_ship_x = -40
+        self.title_exhaust = Trail(EXHAUST_LIFE, EXHAUST_LIFE)
+
+    def release_pooled(self):
+        """自機弾とカプセルをプールに返す (作り直す前に呼ぶ)"""
+        if hasattr(self, 'player'):
+            self.player.release_shots()
+            POWERUP_POOL.release_all(self.items)
+
+    def reset_game_state(self):
+        self.release_pooled()
+        self.timers = TimerWheel()
+        self.stage_events = []
+        self.player = Player(self.audio, self.rng_fx, self.timers)
+        self.clear_enemies()
+        self.items = []
+        self.boss = None
+        self.stage = 0
+        self.stage_timer = 0
+        self.score = 0
+        self.particles.clear()
+        self.is_clearing = False
+        self.clear_timer = 0
+        self.enemy_bullets = BulletStore()
+        self.schedule_stage()
+        if self.mode != "TITLE":
+            self.mode = "GAME"
+
+    def clear_enemies(self):
+        self.enemies = []                                   # 出現順 (当たり判定はこの順)
+        self.enemy_batches = [[] for _ in ENEMY_TYPES]      # 種類ごと (更新はこの単位)
+
+    def schedule_stage(self):
+        """stage_timer が 0 の時点で呼び、このステージの出現表とボスの出現を予約する (前の予約は取り消す)"""
+        for entry in self.stage_events:
+            if entry is not None:
+                self.timers.cancel(entry)
+        self.stage_data = STAGES.get(self.stage)
+        self.spawns = SpawnQueue(self.stage_data.spawns)
+        self.stage_events = [self.timers.schedule(self.stage_data.boss_time, self.spawn_boss), None]
+        self.schedule_spawns()
+
+    def schedule_spawns(self):
+        # 出現表の次の出現の回にだけ起こしてもらう
+        frame = self.spawns.next_frame()
+        if frame is not None:
+            self.stage_events[1] = self.timers.schedule(frame - self.stage_timer, self.spawn_due)
+
+    def spawn_due(self):
+        if self.stage_timer >= self.stage_data.boss_time or self.boss:
+            return
+        for kind, y, pattern in self.spawns.pop_due(self.stage_timer):
+            if y is None:
+                y = self.rng_spawn.randint(PLAYABLE_AREA_TOP + 10, PLAYABLE_AREA_BOTTOM - 10)
+            for dx, dy in PATTERNS[pattern]:
+                e = Enemy(SCREEN_W + 10 + dx, y + dy, self.loop_count, self.stage, kind, timers=self.timers)
+                self.enemies.append(e)
+                self.enemy_batches[kind].append(e)
+        self.schedule_spawns()
+
+    def spawn_boss(self):
+        if not self.boss:
+            self.boss = Boss(self.stage, self.loop_count, self.timers, self.stage_data)
+
+    def advance_stage(self):
+        if self.stage < Game.MAX_STAGE - 1:
+            self.stage += 1
+            self.stage_timer = 0
+            self.boss = None
+            self.is_clearing = False
+            self.schedule_stage()
+        else:
+            self.mode = "ENDING"
+            self.clear_timer = 0
+
+    def restart_loop(self):
+        self.loop_count += 1
+        self.stage = 0
+        self.stage_timer = 0
+        self.boss = None
+        self.clear_enemies()
+        self.release_pooled()
+        self.timers = TimerWheel()
+        self.stage_events = []
+        self.player = Player(self.audio, self.rng_fx, self.timers)
+        self.mode = "GAME"
+        self.enemy_bullets.clear()
+        self.schedule_stage()
+        self.audio.playm(self.stage_data.bgm, loop=True)
+
+    def explode(self, x, y, size_mult=1):
+        """爆発: size_mult に比例した数と速さのパーティクルを撒く"""
+        self.particles.burst(x, y, int(EXPLOSION_PARTICLES * size_mult), speed_scale=size_mult)
+
+    def player_hit(self):
+        if self.player.power_levels["SHIELD"] > 0:
+            self.player.power_levels["SHIELD"] -= 1
+            self.explode(self.player.x, self.player.y)
+            self.audio.play(0, 2) # Shield hit sound
+            return
+
+        self.player.life -= 1
+        self.explode(self.player.x, self.player.y, size_mult=2)
+
+        if self.player.life <= 0:
+            self.mode = "GAMEOVER"
+            self.audio.stop()
+            self.audio.playm(2, loop=False) # Game over music
+        else:
+            self.player.power_levels = {
+                "SPEED": 0, "MSL": 0, "DUAL": 0,
+                "LASER": 0, "OPTION": 0, "SHIELD": 0
+            }
+            self.player.options = []
+            self.player.meter_index = -1
+            self.player.release_shots()
+            self.audio.play(0, 3) # Death sound
+
+    def checksum(self):
+        """リプレイの同期確認用: 主要な状態から作る 32bit 値"""
+        p = self.player
+        state = (self.frame_count, self.mode, self.loop_count, self.stage, self.stage_timer, self.score,
+                 p.x, p.y, p.life, p.meter_index, len(self.enemies), len(self.enemy_bullets), len(self.particles))
+        return zlib.crc32(repr(state).encode())
+
+    def title_exhaust_jitter(self):
+        """タイトルの自機の噴射炎のゆらぎ (上下へ ±0.5)"""
+        return 0.0, self.rng_fx.uniform(-0.5, 0.5)
+
+    def update(self, held=0):
+        """held: このフレームで押されているボタンのビット列 (BTN_*)"""
+        pressed = held & ~self.prev_held
+        self.prev_held = held
+        self.frame_count += 1
+        prof = self.profiler
+        prof.start()
+
+        if self.mode == "TITLE":
+            self.title_timer += 1
+            self.title_ship_x += 2
+            if self.frame_count % 2 == 0:
+                self.title_exhaust.emit(self.title_ship_x - 10, SCREEN_H//2 + 30)
+            self.title_exhaust.step(-2, self.title_exhaust_jitter)
+            if self.title_ship_x > SCREEN_W + 40:
+                self.title_ship_x = -40
+                self.title_exhaust.clear()
+
+            if self.title_timer > 300 or pressed & (BTN_SPACE | BTN_START):
+                self.mode = "GAME"
+                self.title_timer = 0
+                self.title_exhaust.clear()
+                self.audio.playm(self.stage_data.bgm, loop=True)
+            prof.lap("scene")
+            return
+
+        if self.mode == "GAMEOVER":
+            if pressed & (BTN_RESTART | BTN_START):
+                self.loop_count = 0
+                self.reset_game_state()
+                self.audio.playm(self.stage_data.bgm, loop=True)
+            prof.lap("scene")
+            return
+
+        if self.mode == "ENDING":
+            self.clear_timer += 1
+            if self.clear_timer >= END_CREDIT_TIME:
+                self.restart_loop()
+            prof.lap("scene")
+            return
+
+        if self.is_clearing:
+            self.clear_timer += 1
+            if self.clear_timer == 1:
+                self.audio.stop()
+                self.audio.play(0, 4)
+                self.audio.playm(3, loop=False)
+                # 次のステージのデータはクリア後の待ち時間に読んでおく
+                STAGES.prefetch(self.stage + 1)
+
+            if self.clear_timer >= STAGE_CLEAR_WAIT:
+                self.advance_stage()
+                if self.mode == "GAME":
+                    self.audio.playm(self.stage_data.bgm, loop=True)
+            prof.lap("scene")
+            return
+
+        # --- 通常ゲーム更新 ---
+        # 予約した時刻が来たものを起こす (雑魚とボスの出現はここで行い、撃ち直しは次の update で撃てるようにする)
+        self.stage_timer += 1
+        self.timers.advance()
+        prof.lap("spawn")
+
+        self.player.update(held, pressed)
+        prof.lap("player")
+
+        # 敵の更新と衝突判定（自機弾 vs 敵）
+        # 敵弾はボスがいればボスの弾、いなければ雑魚の弾として扱う
+        shot_owner = OWNER_BOSS if self.boss else OWNER_ENEMY
+        px, py = self.player.x, self.player.y
+        for t, batch in zip(ENEMY_TYPES, self.enemy_batches):
+            if batch:
+                t.kernel(batch, px, py, self.enemy_bullets, shot_owner)
+        prof.lap("enemies")
+
+        # ブロードフェーズ: 同じセルに入った自機弾と敵の組だけを詳しく判定する
+        candidates = {}
+        if self.player.bullets and self.enemies:
+            grid = self.grid
+            grid.clear()
+            half = Enemy.SIZE // 2
+            for b in self.player.bullets:
+                grid.insert(b, b.x, b.y - PLAYER_BULLET_H//2, b.x + PLAYER_BULLET_W, b.y + PLAYER_BULLET_H//2, GROUP_PLAYER_BULLET)
+            for e in self.enemies:
+                if e.active:
+                    grid.insert(e, e.x - half, e.y - half, e.x + half, e.y + half, GROUP_ENEMY)
+            for b, e in grid.pairs(GROUP_PLAYER_BULLET, GROUP_ENEMY):
+                candidates.setdefault(e, []).append(b)
+
+        new_enemies = []
+        batches = [[] for _ in ENEMY_TYPES]
+        for e in self.enemies:
+            hit = False
+            for b in candidates.get(e, ()):
+                if (e.active and b.active and
+                    b.x + PLAYER_BULLET_W >= e.x - Enemy.SIZE//2 and b.x <= e.x + Enemy.SIZE//2 and
+                    b.y + PLAYER_BULLET_H//2 >= e.y - Enemy.SIZE//2 and b.y - PLAYER_BULLET_H//2 <= e.y + Enemy.SIZE//2):
+                    hit = True
+                    if not b.is_piercing:
+                        b.active = False
+
+            if hit:
+                e.hp -= 1
+                if e.hp <= 0:
+                    e.active=False
+                    self.score += e.score_value
+                    self.explode(e.x, e.y)
+                    if self.rng_drop.random() < 0.2:
+                        self.items.append(POWERUP_POOL.acquire(e.x, e.y))
+
+            if e.active:
+                new_enemies.append(e)
+                batches[e.kind].append(e)
+        self.enemies = new_enemies
+        self.enemy_batches = batches
+        prof.lap("collide")
+
+        # アイテムの更新と取得
+        for it in self.items:
+            it.update()
+            if abs(it.x - self.player.x) < 8 and abs(it.y - self.player.y) < 8:
+                it.active = False
+                self.player.acquire_capsule()
+        POWERUP_POOL.sweep(self.items)
+        prof.lap("items")
+
+        # 爆発エフェクトの更新
+        self.particles.update()
+        prof.lap("particles")
+
+        # ボスの更新と衝突判定（自機弾 vs ボス）
+        if self.boss:
+            self.boss.update(self.enemy_bullets)
+
+            core_x = self.boss.x + self.boss.SIZE * 0.5 + 5
+            core_y = self.boss.y + self.boss.SIZE // 2
+
+            for b in self.player.bullets:
+                if (b.active and
+                    b.x + PLAYER_BULLET_W >= core_x - 5 and b.x <= core_x + 5 and
+                    b.y + PLAYER_BULLET_H//2 >= core_y - 5 and b.y - PLAYER_BULLET_H//2 <= core_y + 5):
+
+                    if not b.is_piercing:
+                        b.active = False
+
+                    self.boss.hp -= 1
+
+                    if self.boss.hp <= 0:
+                        self.boss.active = False
+                        self.score += self.boss.score_value
+                        self.explode(self.boss.x + self.boss.SIZE//2, self.boss.y + self.boss.SIZE//2, size_mult=3)
+                        self.is_clearing = True
+                        self.clear_timer = 0
+
+                        self.enemy_bullets.set_owner(OWNER_ENEMY)
+                        self.boss = None
+                        break
+        prof.lap("boss")
+
+        # 衝突判定（自機 vs 敵）
+        for e in self.enemies:
+            if e.active and abs(e.x - self.player.x) < 8 and abs(e.y - self.player.y) < 8:
+                self.player_hit()
+                e.active = False
+        prof.lap("body")
+
+        # 衝突判定（自機 vs 敵弾/ボス弾）: 移動・画面外の削除・当たり判定を一括で行う
+        bullets = self.enemy_bullets
+        bullets.step()
+        bullets.cull(-BULLET_MARGIN, -BULLET_MARGIN, SCREEN_W + BULLET_MARGIN, SCREEN_H + BULLET_MARGIN)
+        for _ in range(bullets.hit_test(self.player.x, self.player.y, 7)):
+            self.player_hit()
+
+        # ボスから離れた弾は雑魚の弾として扱う
+        if self.boss:
+            n = bullets.count
+            bullets.set_owner(OWNER_BOSS)
+            bullets.set_owner(OWNER_ENEMY, bullets.x[:n] <= self.boss.x - 10)
+        prof.lap("enemy_bullets")
+
+        if prof.enabled:
+            prof.count("enemies", len(self.enemies))
+            prof.count("player_bullets", len(self.player.bullets))
+            prof.count("enemy_bullets", len(bullets))
+            prof.count("items", len(self.items))
+            prof.count("particles", len(self.particles))
+            prof.count("shot_latency", self.player.fire_probe.last or 0)
+            prof.count("timers", len(self.timers))
+            prof.count("timers_due", self.timers.fired)
+
+
+# -------------------- ヘッドレス実行 (Headless) --------------------
+def run_headless(inputs, frames=None, game=None, recorder=None):
+    """入力列 inputs (1フレーム1要素の BTN_* ビット列) でゲームを進めて Game を返す
+
+    inputs には game を受け取ってビット列を返す関数 (autopilot など) も渡せる。
+    frames を指定すると inputs が尽きた後は無入力で frames フレームまで進める。
+    recorder (replay.ReplayRecorder) を渡すと実際に使った入力を記録する。
+    フレームレートの制限はないので、リプレイの再生は実時間より速く終わる。
+    """
+    if game is None:
+        game = Game()
+    if callable(inputs):
+        policy = inputs
+        inputs = iter(lambda: policy(game), None)
+    n = 0
+    for held in inputs:
+        if frames is not None and n >= frames:
+            break
+        if recorder is not None:
+            recorder.record(held)
+        game.update(held)
+        game.profiler.end_frame()
+        n += 1
+    if frames is not None:
+        while n < frames:
+            if recorder is not None:
+                recorder.record(0)
+            game.update(0)
+            game.profiler.end_frame()
+            n += 1
+    if recorder is not None:
+        recorder.finish(game)
+    return game
+
+
+def autopilot(game):
+    """バランス調整・ソーク用の簡易自動操縦: 前方の脅威を上下に避けつつ撃ち続ける"""
+    p = game.player
+    held = BTN_SHOT
+    if game.frame_count % 2 == 0:
+        held |= BTN_RESTART
+        if p.meter_index != -1 and POWER_UP_NAMES[p.meter_index] in ("SPEED", "OPTION", "SHIELD"):
+            held |= BTN_SPACE
+
+    threats = [(e.x, e.y) for e in game.enemies]
+    threats.extend(game.enemy_bullets.positions())
+    danger = None
+    for tx, ty in threats:
+        if -6 < tx - p.x < 36 and abs(ty - p.y) < 12:
+            if danger is None or tx < danger[0]:
+                danger = (tx, ty)
+
+    if danger is not None:
+        go_up = danger[1] >= p.y
+        if go_up and p.y <= PLAYABLE_AREA_TOP + Player.SIZE + 2:
+            go_up = False
+        elif not go_up and p.y >= PLAYABLE_AREA_BOTTOM - Player.SIZE - 2:
+            go_up = True
+        held |= BTN_UP if go_up else BTN_DOWN
+    else:
+        if game.boss:
+            target_y = game.boss.y + Boss.SIZE // 2
+        elif game.enemies:
+            target_y = min(game.enemies, key=lambda e: e.x).y
+        else:
+            target_y = PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2
+        if target_y < p.y - 2: held |= BTN_UP
+        elif target_y > p.y + 2: held |= BTN_DOWN
+
+    if p.x > 30: held |= BTN_LEFT
+    elif p.x < 24: held |= BTN_RIGHT
+    return held
+
+
+def soak_inputs(seed=0, hold=12):
+    """ソークテスト用の入力列: ショットを押し続けながら hold フレームごとに移動方向を変える
+
+    ときどきパワーアップを決定し、ゲームオーバー時は R で即リスタートする。
+    """
+    rng = random.Random(seed)
+    moves = [0, BTN_UP, BTN_DOWN, BTN_UP | BTN_RIGHT, BTN_DOWN | BTN_LEFT]
+    frame = 0
+    move = 0
+    while True:
+        if frame % hold == 0:
+            move = rng.choice(moves)
+        held = BTN_SHOT | move
+        # 押しっぱなしだと押下として扱われないので2フレームに1回だけ押す
+        if frame % 2 == 0:
+            held |= BTN_RESTART
+            if rng.random() < 0.05:
+                held |= BTN_SPACE
+        yield held
+        frame += 1
+
+
+if __name__ == "__main__":
+    import argparse
+    import itertools
+    import time
+
+    parser = argparse.ArgumentParser(description="HYPER SHOOTER 2026 をウィンドウなしで実行する")
+    parser.add_argument("--frames", type=int, default=60 * 60 * 10, help="実行フレーム数 (既定: 60fps で10分)")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--pilot", choices=["auto", "random"], default="auto", help="入力の生成方法")
+    parser.add_argument("--record", metavar="PATH", help="入力をリプレイファイルに記録する")
+    parser.add_argument("--play", metavar="PATH", help="リプレイファイルを最高速で再生して同期を確認する")
+    parser.add_argument("--profile", metavar="CSV", help="区間ごとの処理時間をフレームごとに CSV へ書き出す")
+    args = parser.parse_args()
+
+    from replay import ReplayRecorder, load_replay
+
+    recorder = None
+    if args.play:
+        replay = load_replay(args.play)
+        game = Game(seed=replay.seed)
+        inputs = replay.inputs()
+        args.frames = replay.frames
+    else:
+        game = Game(seed=args.seed)
+        if args.pilot == "auto":
+            inputs = autopilot
+        else:
+            inputs = itertools.islice(soak_inputs(args.seed), args.frames)
+        if args.record:
+            recorder = ReplayRecorder(game.seed)
+
+    if args.profile:
+        game.profiler.toggle()
+        game.profiler.open_csv(args.profile)
+
+    start = time.perf_counter()
+    run_headless(inputs, frames=args.frames, game=game, recorder=recorder)
+    elapsed = time.perf_counter() - start
+    game.profiler.close_csv()
+
+    print(f"frames={args.frames} elapsed={elapsed:.2f}s speed={args.frames / 60 / elapsed:.1f}x realtime")
+    if recorder is not None:
+        recorder.save(args.record)
+        print(f"recorded {args.record} ({len(recorder.to_bytes())} bytes)")
+    if args.play:
+        ok = game.checksum() == replay.checksum
+        print(f"replay {'in sync' if ok else 'DESYNC'} (checksum {game.checksum():08x})")
+    print(f"mode={game.mode} loop={game.loop_count + 1} stage={game.stage + 1} score={game.score}")
+    for name, pool in (("bullets", BULLET_POOL), ("items", POWERUP_POOL)):
+        live, free, created = pool.stats()
+        print(f"pool {name}: live={live} free={free} created={created}")
+    probe = game.player.fire_probe
+    print(f"shot latency: presses={probe.count} avg={probe.average():.2f} max={probe.max} frames")
@@ -2,9 +2,12 @@
 
 import pyxel
 import random
-import math
 import os
 
+from particles import ParticlePool
+from object_pool import ObjectPool
+from trig_table import SwayCurve, aim
+
 # Cボタン(b3)の誤割当を修正し、シーマイクのAボタンがPyxelのAボタン(b2)になるよう調整
 mapping = "03000000490b00004406000000000000,ASCII Game Controller,a:b0,b:b1,x:b3,y:b2,back:b8,start:b9,leftshoulder:b4,rightshoulder:b5,dpup:h0.1,dpdown:h0.4,dpleft:h0.8,dpright:h0.2,platform:Windows,"
 os.environ["SDL_GAMECONTROLLERCONFIG"] = mapping
@@ -90,40 +93,18 @@ END_CREDIT_TIME = 180
 
 
 # -------------------- 爆発エフェクト (Explosion) --------------------
-class Explosion:
-    def __init__(self, x, y, size_mult=1):
-        self.particles = []
-        num_particles = int(20 * size_mult)
-        for _ in range(num_particles):
-            angle = random.uniform(0, 2*math.pi)
-            speed = random.uniform(1, 3) * size_mult * 0.5
-            self.particles.append({
-                'x': float(x),
-                'y': float(y),
-                'dx': math.cos(angle)*speed,
-                'dy': math.sin(angle)*speed,
-                'color': random.randint(8,11),
-                'life': random.randint(15,30)
-            })
-        self.active = True
-
-    def update(self):
-        for p in self.particles:
-            p['x'] += p['dx']
-            p['y'] += p['dy']
-            p['life'] -= 1
-        self.particles = [p for p in self.particles if p['life']>0]
-        if not self.particles:
-            self.active = False
-
-    def draw(self):
-        for p in self.particles:
-            pyxel.pset(int(p['x']), int(p['y']), p['color'])
+# パーティクルは particles.ParticlePool にまとめて持つ (size_mult=1 で20粒、速さ 0.5〜1.5)
+PARTICLE_CAPACITY = 512
+EXPLOSION_PARTICLES = 20
 
 
 # -------------------- 弾 (Bullet) --------------------
 class Bullet:
     def __init__(self, x, y, type="NORMAL", dx=2, dy=0, color=7, is_player=False):
+        self.reset(x, y, type, dx, dy, color, is_player)
+
+    def reset(self, x, y, type="NORMAL", dx=2, dy=0, color=7, is_player=False):
+        """プールから再利用するときの初期化 (__init__ と同じ引数)"""
         self.x = float(x)
         self.y = float(y)
         self.type = type
@@ -170,9 +151,15 @@ class Bullet:
             pyxel.circ(xi, yi, int(self.size), self.color)
 
 
+BULLET_POOL = ObjectPool(Bullet)
+
+
 # -------------------- パワーアップカプセル (PowerUp) --------------------
 class PowerUp:
     def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.x = float(x)
         self.y = float(y)
         self.active = True
@@ -195,6 +182,9 @@ class PowerUp:
         pyxel.pset(x, y, 7)
 
 
+POWERUP_POOL = ObjectPool(PowerUp)
+
+
 # -------------------- プレイヤー (Player) --------------------
 class Player:
     SIZE = 8
@@ -246,7 +236,7 @@ class Player:
 
         self.update_options()
         for b in self.bullets: b.update()
-        self.bullets = [b for b in self.bullets if b.active]
+        BULLET_POOL.sweep(self.bullets)
 
         self.exhaust.append({'x': self.x-8, 'y': self.y, 'life': 8})
         for e in self.exhaust:
@@ -296,15 +286,15 @@ class Player:
 
         for fx, fy in fire_points:
             if self.power_levels["MSL"] > 0: 
-                self.bullets.append(Bullet(fx, fy, type="MSL", dx=3, dy=0, color=8, is_player=True))
+                self.bullets.append(BULLET_POOL.acquire(fx, fy, type="MSL", dx=3, dy=0, color=8, is_player=True))
 
             if self.power_levels["LASER"] > 0:
-                self.bullets.append(Bullet(fx, fy, type="LASER", dx=4, color=10, is_player=True))
+                self.bullets.append(BULLET_POOL.acquire(fx, fy, type="LASER", dx=4, color=10, is_player=True))
             elif self.power_levels["DUAL"] > 0:
-                self.bullets.append(Bullet(fx, fy, type="DUAL", dx=4, dy=-1, color=11, is_player=True))
-                self.bullets.append(Bullet(fx, fy, type="DUAL", dx=4, dy=1, color=11, is_player=True))
+                self.bullets.append(BULLET_POOL.acquire(fx, fy, type="DUAL", dx=4, dy=-1, color=11, is_player=True))
+                self.bullets.append(BULLET_POOL.acquire(fx, fy, type="DUAL", dx=4, dy=1, color=11, is_player=True))
             else:
-                self.bullets.append(Bullet(fx, fy, type="NORMAL", dx=4, color=11, is_player=True))
+                self.bullets.append(BULLET_POOL.acquire(fx, fy, type="NORMAL", dx=4, color=11, is_player=True))
             
         try:
             pyxel.play(0, 0)
@@ -381,6 +371,7 @@ class Player:
 # -------------------- 敵 (Enemy) --------------------
 class Enemy:
     SIZE = 6
+    SWAY = SwayCurve(0.15, 15)   # WAVER の上下の揺れ
     def __init__(self, x, y, loop_count, stage, type="FIGHTER"):
         self.x = float(x)
         self.y = float(y)
@@ -417,7 +408,7 @@ class Enemy:
 
         if self.type == "WAVER":
             self.x -= 1.2 * self.speed_multiplier
-            self.y = self.initial_y + math.sin(self.wave_timer * 0.15) * 15
+            self.y = self.initial_y + Enemy.SWAY(self.wave_timer)
         elif self.type == "FIGHTER":
             self.x -= 1 * self.speed_multiplier
         elif self.type == "TURRET":
@@ -436,15 +427,8 @@ class Enemy:
         return bullet_to_fire
 
     def fire_to_player(self, px, py):
-        target_x = px - self.x
-        target_y = py - self.y
-        angle = math.atan2(target_y, target_x)
-
-        speed = 1.5
-        dx = math.cos(angle) * speed
-        dy = math.sin(angle) * speed
-
-        return Bullet(self.x, self.y, dx=dx, dy=dy, color=9, is_player=False)
+        dx, dy = aim(px - self.x, py - self.y, 1.5)
+        return BULLET_POOL.acquire(self.x, self.y, dx=dx, dy=dy, color=9, is_player=False)
 
     def draw(self):
         x, y, r = int(self.x), int(self.y), 3
@@ -464,6 +448,7 @@ class Enemy:
 # -------------------- ボス (Boss) --------------------
 class Boss:
     SIZE = 30
+    SWAY = SwayCurve(0.05, PLAYABLE_H_EFFECTIVE / 2 - SIZE)
     def __init__(self, stage, loop_count):
         self.x = float(SCREEN_W - 50)
         self.y = float(PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2 - Boss.SIZE // 2)
@@ -484,7 +469,7 @@ class Boss:
     def update(self):
         self.timer += 1
 
-        target_y = PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2 - Boss.SIZE // 2 + math.sin(self.timer * 0.05) * (PLAYABLE_H_EFFECTIVE / 2 - Boss.SIZE)
+        target_y = PLAYABLE_AREA_TOP + PLAYABLE_H_EFFECTIVE // 2 - Boss.SIZE // 2 + Boss.SWAY(self.timer)
         self.y += (target_y - self.y) * 0.1
 
         min_boss_y = PLAYABLE_AREA_TOP + 5
@@ -494,16 +479,16 @@ class Boss:
         bullet_color = 9
 
         if self.timer % 30 == 0:
-            self.bullets.append(Bullet(self.x, self.y + 12, dx=-2 * self.speed_multiplier, dy=0, color=bullet_color, is_player=False))
+            self.bullets.append(BULLET_POOL.acquire(self.x, self.y + 12, dx=-2 * self.speed_multiplier, dy=0, color=bullet_color, is_player=False))
 
         if self.stage % 2 != 0 and self.timer % 60 == 0:
             for dy in [-1, 0, 1]:
-                self.bullets.append(Bullet(self.x, self.y + 12, dx=-2 * self.speed_multiplier, dy=dy * self.speed_multiplier, color=bullet_color, is_player=False))
+                self.bullets.append(BULLET_POOL.acquire(self.x, self.y + 12, dx=-2 * self.speed_multiplier, dy=dy * self.speed_multiplier, color=bullet_color, is_player=False))
         elif self.stage % 2 == 0 and self.timer % 45 == 0:
-            self.bullets.append(Bullet(self.x, self.y + 12, dx=-1 * self.speed_multiplier, dy=0.5, color=bullet_color, is_player=False))
+            self.bullets.append(BULLET_POOL.acquire(self.x, self.y + 12, dx=-1 * self.speed_multiplier, dy=0.5, color=bullet_color, is_player=False))
 
         for b in self.bullets: b.update()
-        self.bullets = [b for b in self.bullets if b.active]
+        BULLET_POOL.sweep(self.bullets)
 
     def draw(self):
         main_color = 1
@@ -542,6 +527,7 @@ class App:
         
         self.loop_count = 0
         self.mode = "TITLE"
+        self.particles = ParticlePool(PARTICLE_CAPACITY, speed=(0.5, 1.5), life=(15, 30), colors=(8, 9, 10, 11))
         
         self.reset_game_state()
 
@@ -584,7 +570,17 @@ class App:
         pyxel.sound(30).set("c3e3g3c4", "t", "7", "v", 10)
         pyxel.music(3).set([30], [], [], [])
         
+    def release_pooled(self):
+        """弾とカプセルをプールに返す (作り直す前に呼ぶ)"""
+        if hasattr(self, 'player'):
+            BULLET_POOL.release_all(self.player.bullets)
+            BULLET_POOL.release_all(self.foreign_bullets)
+            if self.boss:
+                BULLET_POOL.release_all(self.boss.bullets)
+            POWERUP_POOL.release_all(self.items)
+
     def reset_game_state(self):
+        self.release_pooled()
         self.player = Player()  
         self.enemies = []
         self.items = []
@@ -592,7 +588,7 @@ class App:
         self.stage = 0
         self.stage_timer = 0
         self.score = 0
-        self.explosions = []
+        self.particles.clear()
         self.is_clearing = False
         self.clear_timer = 0
         self.foreign_bullets = []  
@@ -611,6 +607,7 @@ class App:
 
     def restart_loop(self):
         self.loop_count += 1
+        self.release_pooled()
         self.stage = 0
         self.stage_timer = 0
         self.boss = None
@@ -624,10 +621,14 @@ class App:
         except Exception:
             pass
 
+    def explode(self, x, y, size_mult=1):
+        """爆発: size_mult に比例した数と速さのパーティクルを撒く"""
+        self.particles.burst(x, y, int(EXPLOSION_PARTICLES * size_mult), speed_scale=size_mult)
+
     def player_hit(self):
         if self.player.power_levels["SHIELD"] > 0:
             self.player.power_levels["SHIELD"] -= 1
-            self.explosions.append(Explosion(self.player.x, self.player.y))
+            self.explode(self.player.x, self.player.y)
             try:
                 pyxel.play(0, 2) # Shield hit sound
             except Exception:
@@ -635,7 +636,7 @@ class App:
             return
 
         self.player.life -= 1
-        self.explosions.append(Explosion(self.player.x, self.player.y, size_mult=2))
+        self.explode(self.player.x, self.player.y, size_mult=2)
 
         if self.player.life <= 0:
             self.mode = "GAMEOVER"
@@ -651,7 +652,7 @@ class App:
             }
             self.player.options = []
             self.player.meter_index = -1
-            self.player.bullets = []
+            BULLET_POOL.release_all(self.player.bullets)
             try:
                 pyxel.play(0, 3) # Death sound
             except Exception:
@@ -770,9 +771,9 @@ class App:
                 if e.hp <= 0:
                     e.active=False
                     self.score += e.score_value
-                    self.explosions.append(Explosion(e.x, e.y))
+                    self.explode(e.x, e.y)
                     if random.random() < 0.2:
-                        self.items.append(PowerUp(e.x, e.y))
+                        self.items.append(POWERUP_POOL.acquire(e.x, e.y))
 
             if e.active:
                 new_enemies.append(e)
@@ -790,11 +791,10 @@ class App:
             if abs(it.x - self.player.x) < 8 and abs(it.y - self.player.y) < 8:
                 it.active = False
                 self.player.acquire_capsule()
-        self.items = [it for it in self.items if it.active]
+        POWERUP_POOL.sweep(self.items)
 
         # 爆発エフェクトの更新
-        for ex in self.explosions: ex.update()
-        self.explosions = [ex for ex in self.explosions if ex.active]
+        self.particles.update()
 
         # ボスの更新と衝突判定（自機弾 vs ボス）
         if self.boss:
@@ -816,7 +816,7 @@ class App:
                     if self.boss.hp <= 0:
                         self.boss.active = False
                         self.score += self.boss.score_value
-                        self.explosions.append(Explosion(self.boss.x + self.boss.SIZE//2, self.boss.y + self.boss.SIZE//2, size_mult=3))
+                        self.explode(self.boss.x + self.boss.SIZE//2, self.boss.y + self.boss.SIZE//2, size_mult=3)
                         self.is_clearing = True
                         self.clear_timer = 0
                         
@@ -845,6 +845,8 @@ class App:
                 self.player_hit()
             if b.active:
                 new_combined.append(b)
+            else:
+                BULLET_POOL.release(b)
 
         # 敵弾リストの再分割
         if self.boss:
@@ -953,7 +955,7 @@ class App:
         pyxel.rectb(0, PLAYABLE_AREA_TOP, SCREEN_W, PLAYABLE_H_EFFECTIVE, 7)
 
         # ゲームオブジェクト描画
-        for ex in self.explosions: ex.draw()
+        for x, y, color, _, _ in self.particles.live(): pyxel.pset(x, y, color)
         for it in self.items: it.draw()
         for e in self.enemies: e.draw()
 
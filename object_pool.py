@@ -0,0 +1,62 @@
+# object_pool.py
+# 弾やカプセルなど、短命なオブジェクトを使い回すためのプール
+# acquire() で空きインスタンスを reset() して取り出し、sweep()/release() で返す。
+# 定常状態ではフレームごとの新規生成がほぼなくなり、Web 版 (Pyodide) の GC 停止が減る。
+# pyxel には依存しない。
+
+
+class ObjectPool:
+    """cls のインスタンスを使い回すプール
+
+    cls は __init__ と同じ引数を受け取る reset() を持つこと。
+    live は貸し出し中の数、free は返却済みで再利用待ちの数、created は実際に生成した数。
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self._free = []
+        self.live = 0
+        self.created = 0
+
+    @property
+    def free(self):
+        return len(self._free)
+
+    def acquire(self, *args, **kwargs):
+        if self._free:
+            obj = self._free.pop()
+            obj.reset(*args, **kwargs)
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        self.live += 1
+        return obj
+
+    def release(self, obj):
+        self.live -= 1
+        self._free.append(obj)
+
+    def release_all(self, objs):
+        """objs をすべて返却して空にする (リストを捨てる代わりに使う)"""
+        self.live -= len(objs)
+        self._free.extend(objs)
+        objs.clear()
+
+    def sweep(self, objs):
+        """objs から active でないものを返却し、残りをその場で前に詰める (順番は保つ)。返却した数を返す"""
+        free = self._free
+        j = 0
+        for obj in objs:
+            if obj.active:
+                objs[j] = obj
+                j += 1
+            else:
+                free.append(obj)
+        released = len(objs) - j
+        if released:
+            del objs[j:]
+            self.live -= released
+        return released
+
+    def stats(self):
+        return self.live, self.free, self.created
@@ -0,0 +1,83 @@
+# particles.py
+# 爆発パーティクルの共有プール
+# 1粒ごとに dict を作る代わりに、固定容量の平たい配列 (x/y/dx/dy/life/color/size) に詰めて
+# 更新は NumPy の一括演算で行う。pyxel には依存しない (描画は各ゲーム側)。
+
+import numpy as np
+
+
+class ParticlePool:
+    """固定容量のパーティクルプール
+
+    speed/life/size は (最小, 最大) の範囲、colors は色の候補。
+    drag は毎フレーム速度に掛ける減衰率 (ドラゴン系の 0.96 など、1.0 で減衰なし)。
+    容量を超えたバーストは入りきる分だけ出す。
+    """
+
+    def __init__(self, capacity=1024, drag=1.0, speed=(0.5, 1.5), life=(15, 30),
+                 colors=(8, 9, 10, 11), size=(1, 1), seed=None):
+        self.capacity = capacity
+        self.drag = drag
+        self.speed = speed
+        self.life_range = life
+        self.colors = np.array(colors, dtype=np.int8)
+        self.size_range = size
+        self.rng = np.random.default_rng(seed)
+
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.int8)
+        self.size = np.zeros(capacity, dtype=np.int8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def burst(self, x, y, count, speed_scale=1.0):
+        """(x, y) から count 粒を全方向に一度に撒く"""
+        n = self.count
+        k = min(int(count), self.capacity - n)
+        if k <= 0:
+            return
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, k)
+        speed = rng.uniform(self.speed[0], self.speed[1], k) * speed_scale
+        s = slice(n, n + k)
+        self.x[s] = x
+        self.y[s] = y
+        self.dx[s] = np.cos(angle) * speed
+        self.dy[s] = np.sin(angle) * speed
+        self.life[s] = rng.integers(self.life_range[0], self.life_range[1] + 1, k)
+        self.color[s] = self.colors[rng.integers(0, len(self.colors), k)]
+        self.size[s] = rng.integers(self.size_range[0], self.size_range[1] + 1, k)
+        self.count = n + k
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+        if self.drag != 1.0:
+            self.dx[:n] *= self.drag
+            self.dy[:n] *= self.drag
+        self.life[:n] -= 1
+
+        alive = self.life[:n] > 0
+        k = int(np.count_nonzero(alive))
+        if k != n:
+            for col in (self.x, self.y, self.dx, self.dy, self.life, self.color, self.size):
+                col[:k] = col[:n][alive]
+            self.count = k
+
+    def live(self):
+        """描画用: 生きている粒の (x, y, color, life, size) を整数で返す"""
+        n = self.count
+        return zip(self.x[:n].astype(np.int32).tolist(), self.y[:n].astype(np.int32).tolist(),
+                   self.color[:n].tolist(), self.life[:n].tolist(), self.size[:n].tolist())
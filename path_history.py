@@ -0,0 +1,39 @@
+# path_history.py
+# 自機の通った道の記録 (グラディウスのオプションの追従用)
+# 自機が動いた更新ごとに位置を長さを決めたリングバッファへ書き、d 回前の位置を O(1) で取り出す。
+# 止まっている間は記録しないので、オプションも止まる (自機に重なって縮まない)。
+# 記録も取り出しも決めた配列に書くだけで、フレームごとにリストやタプルを作らない。pyxel には依存しない。
+
+
+class PathHistory:
+    """直近 size - 1 回分の移動を覚えるリングバッファ"""
+
+    def __init__(self, size, x, y):
+        self.size = size
+        self.xs = [0.0] * size
+        self.ys = [0.0] * size
+        self.head = 0          # 一番新しい位置
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """道を (x, y) だけで埋める (オプションは全部ここから出てくる)"""
+        xs, ys = self.xs, self.ys
+        for i in range(self.size):
+            xs[i] = x
+            ys[i] = y
+
+    def record(self, x, y):
+        """(x, y) が一番新しい位置と違えば記録する"""
+        h = self.head
+        if self.xs[h] == x and self.ys[h] == y:
+            return
+        h = (h + 1) % self.size
+        self.xs[h] = x
+        self.ys[h] = y
+        self.head = h
+
+    def sample_into(self, out, delay):
+        """delay 回前の位置を out[0], out[1] に書く (delay は size - 1 まで)"""
+        i = (self.head - delay) % self.size
+        out[0] = self.xs[i]
+        out[1] = self.ys[i]
@@ -0,0 +1,93 @@
+# profiler.py
+# 1フレームの処理時間を区間ごとに測るプロファイラ
+# start() のあと、処理のまとまりが終わるごとに lap("名前") を呼ぶと、前の lap からの時間がその区間に入る。
+# enabled が False の間は start/lap/count/end_frame が何もせずに戻るだけなので、入れたままでよい。
+# pyxel には依存しない (オーバーレイの描画は各ゲーム側)。
+
+import csv
+import time
+from collections import deque
+
+
+class FrameProfiler:
+    """区間ごとの時間 (ms) と個数を1フレーム単位で集める
+
+    window フレーム分の履歴から移動平均を出す。open_csv() するとフレームごとの値を CSV に書き出す。
+    """
+
+    def __init__(self, window=60):
+        self.enabled = False
+        self.frame_no = 0
+        self.sections = {}      # 区間名 → このフレームの ms (登録順に並ぶ)
+        self.counts = {}        # 個数の名前 → このフレームの値
+        self.history = deque(maxlen=window)
+        self._last = 0.0
+        self._csv = None
+        self._writer = None
+
+    def declare(self, *names):
+        """区間名を先に登録しておく (表示と CSV の列の順番になる)"""
+        for name in names:
+            self.sections.setdefault(name, 0.0)
+
+    def declare_counts(self, *names):
+        for name in names:
+            self.counts.setdefault(name, 0)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._last = time.perf_counter()
+        self.history.clear()
+
+    def start(self):
+        if self.enabled:
+            self._last = time.perf_counter()
+
+    def lap(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def count(self, name, n):
+        if self.enabled:
+            self.counts[name] = n
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        sample = dict(self.sections)
+        self.history.append(sample)
+        if self._csv is not None:
+            if self._writer is None:
+                self._writer = csv.writer(self._csv)
+                self._writer.writerow(["frame"] + list(sample) + [f"n_{name}" for name in self.counts])
+            self._writer.writerow([self.frame_no] + [f"{ms:.4f}" for ms in sample.values()]
+                                  + list(self.counts.values()))
+        for name in self.sections:
+            self.sections[name] = 0.0
+        self.frame_no += 1
+
+    def averages(self):
+        """[(区間名, 直近 window フレームの平均 ms)]"""
+        n = len(self.history)
+        if n == 0:
+            return []
+        return [(name, sum(s.get(name, 0.0) for s in self.history) / n) for name in self.sections]
+
+    # --- CSV 出力 ---
+    def open_csv(self, path):
+        self.close_csv()
+        self._csv = open(path, "w", newline="")
+        self._writer = None
+
+    def close_csv(self):
+        if self._csv is not None:
+            self._csv.close()
+            self._csv = None
+            self._writer = None
+
+    @property
+    def recording(self):
+        return self._csv is not None
@@ -0,0 +1,168 @@
+# projectile_store.py
+# 軌道が撃った時点で決まる弾 (直進・一定の加速度) を式で持つ弾ストア
+# 弾ごとに撃った回 t0・撃った位置・速度・加速度だけを覚え、毎フレームの移動は時計を1つ進めるだけにする。
+# 位置は描画や当たり判定で要るときに経過回数 n から一括で計算する:
+#     x(n) = x0 + vx * n + ax * n * (n + 1) / 2   (1回ごとに速度へ加速度を足してから動かすのと同じ)
+# 画面外に出る回も撃った時点で計算しておくので、cull() は一番早く出る弾の回が来たときだけ詰め直す。
+# 弾の順番・容量の広げ方・hit_test() の扱いは bullet_store.BulletStore と同じ。pyxel には依存しない。
+
+import numpy as np
+
+from bullet_store import BT_NORMAL, OWNER_ENEMY
+
+NEVER = 1 << 62   # 範囲から出ない弾の消える回
+
+
+def exit_age(p0, v, a, lo, hi):
+    """1つの軸で、撃ってから n (1 以上) 回後の位置が [lo, hi] の外にある最初の n (出なければ inf)
+
+    位置は n の2次式なので、境界との交点 (根) の前後の整数と n = 1 だけを調べればよい。
+    根の計算の誤差で1つずれても拾えるように、根の整数部 +0〜+2 を候補にする。
+    """
+    p0, v, a = np.broadcast_arrays(np.asarray(p0, dtype=float), np.asarray(v, dtype=float),
+                                   np.asarray(a, dtype=float))
+    half = a * 0.5
+    b = v + half
+    roots = []
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        linear = half == 0
+        for bound in (lo, hi):
+            c = p0 - bound
+            sq = np.sqrt(b * b - 4 * half * c)
+            r = -c / b
+            roots.append(np.where(linear, r, (-b - sq) / (2 * half)))
+            roots.append(np.where(linear, r, (-b + sq) / (2 * half)))
+        cands = [np.ones_like(p0)]
+        for r in roots:
+            base = np.floor(r)
+            cands += [base, base + 1, base + 2]
+        n = np.stack(cands, axis=-1)
+        n = np.where(np.isfinite(n) & (n >= 1), n, np.inf)
+        p = p0[..., None] + v[..., None] * n + a[..., None] * n * (n + 1) * 0.5
+        out = ((p < lo) | (p > hi)) & np.isfinite(n)
+    return np.where(out, n, np.inf).min(axis=-1)
+
+
+class ProjectileStore:
+    """撃った回・位置・速度・加速度の列を持ち、位置を式で求める敵弾ストア
+
+    bounds (x0, y0, x1, y1) の外に出た弾は cull() で消える (BulletStore.cull と同じ範囲の判定)。
+    step() は時計を進めるだけで、持ち主ごとに進める step(owner) はない。
+    """
+
+    def __init__(self, bounds, capacity=256):
+        self.bounds = bounds
+        self.count = 0
+        self.now = 0
+        self.next_expire = NEVER   # 生きている弾のうち一番早く範囲から出る回
+        self._xy = None            # xy() の結果 (時計を進めるか弾が増減するまで使い回す)
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        n = self.count
+        old = getattr(self, "x0", None)
+        self.capacity = capacity
+        cols = {
+            "x0": np.zeros(capacity), "y0": np.zeros(capacity),
+            "vx": np.zeros(capacity), "vy": np.zeros(capacity),
+            "ax": np.zeros(capacity), "ay": np.zeros(capacity),
+            "t0": np.zeros(capacity, dtype=np.int64), "expire": np.zeros(capacity, dtype=np.int64),
+            "type": np.zeros(capacity, dtype=np.int8), "owner": np.zeros(capacity, dtype=np.int8),
+        }
+        for name, col in cols.items():
+            if old is not None and n:
+                col[:n] = getattr(self, name)[:n]
+            setattr(self, name, col)
+        self._cols = tuple(cols)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.next_expire = NEVER
+        self._xy = None
+
+    def spawn(self, x, y, dx, dy, type=BT_NORMAL, owner=OWNER_ENEMY, ax=0.0, ay=0.0):
+        self.spawn_batch(x, y, [dx], dy, type, owner, ax, ay)
+
+    def spawn_batch(self, x, y, dx, dy, type=BT_NORMAL, owner=OWNER_ENEMY, ax=0.0, ay=0.0):
+        """複数の弾を一度に追加する (引数は配列またはスカラー、長さは dx に合わせる)"""
+        dx = np.asarray(dx, dtype=float)
+        k = dx.size
+        if k == 0:
+            return
+        n = self.count
+        if n + k > self.capacity:
+            cap = self.capacity
+            while cap < n + k:
+                cap *= 2
+            self._alloc(cap)
+        s = slice(n, n + k)
+        self.x0[s] = x
+        self.y0[s] = y
+        self.vx[s] = dx
+        self.vy[s] = dy
+        self.ax[s] = ax
+        self.ay[s] = ay
+        self.t0[s] = self.now
+        self.type[s] = type
+        self.owner[s] = owner
+        x0, y0, x1, y1 = self.bounds
+        age = np.minimum(exit_age(self.x0[s], self.vx[s], self.ax[s], x0, x1),
+                         exit_age(self.y0[s], self.vy[s], self.ay[s], y0, y1))
+        expire = np.minimum(self.now + age, NEVER).astype(np.int64)
+        self.expire[s] = expire
+        self.next_expire = min(self.next_expire, int(expire.min()))
+        self.count = n + k
+        self._xy = None
+
+    def step(self):
+        """弾を1フレーム進める (時計を進めるだけ)"""
+        self.now += 1
+        self._xy = None
+
+    def _keep(self, keep):
+        n = self.count
+        k = int(np.count_nonzero(keep))
+        if k == n:
+            return
+        for name in self._cols:
+            col = getattr(self, name)
+            col[:k] = col[:n][keep]
+        self.count = k
+        self.next_expire = int(self.expire[:k].min()) if k else NEVER
+        self._xy = None
+
+    def cull(self):
+        """範囲から出た弾を消す (一番早く出る弾の回が来るまでは何もしない)"""
+        if self.now >= self.next_expire:
+            self._keep(self.expire[:self.count] > self.now)
+
+    def xy(self):
+        """有効な弾の今の位置 (x, y) の配列"""
+        if self._xy is None:
+            n = self.count
+            age = (self.now - self.t0[:n]).astype(float)
+            ramp = age * (age + 1) * 0.5
+            self._xy = (self.x0[:n] + self.vx[:n] * age + self.ax[:n] * ramp,
+                        self.y0[:n] + self.vy[:n] * age + self.ay[:n] * ramp)
+        return self._xy
+
+    def hit_test(self, px, py, r, ry=None):
+        """(px, py) から横 r・縦 ry (省略時は r) 未満に入った弾を消し、その数を返す"""
+        if self.count == 0:
+            return 0
+        if ry is None:
+            ry = r
+        x, y = self.xy()
+        hit = (np.abs(x - px) < r) & (np.abs(y - py) < ry)
+        hits = int(np.count_nonzero(hit))
+        if hits:
+            self._keep(~hit)
+        return hits
+
+    def positions(self):
+        """描画用: 有効な弾の (x, y) を Python のリストで返す"""
+        x, y = self.xy()
+        return list(zip(x.tolist(), y.tolist()))
@@ -0,0 +1,95 @@
+# replay.py
+# HYPER SHOOTER 2026 のリプレイ (入力の記録と再生)
+# ゲームの乱数はすべて Game のシードから作るので、シードと毎フレームのボタンのビット列 (BTN_*)
+# があればプレイを1フレームずつ正確に再現できる。pyxel には依存しない。
+#
+# ファイル形式 (リトルエンディアン):
+#   ヘッダ  "HSR1", シード (u64), フレーム数 (u32), 最終フレームのチェックサム (u32)
+#   本体    (ビット列 u16, 連続フレーム数 u16) の組を並べて zlib で圧縮したもの
+
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b"HSR1"
+HEADER = struct.Struct("<4sQII")
+MAX_RUN = 0xFFFF
+
+
+class ReplayRecorder:
+    """1フレームごとに record(held) を呼んで入力を貯める (同じ入力が続く間は数えるだけ)"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.frames = 0
+        self.checksum = 0
+        self.runs = array("H")
+        self._held = None
+        self._count = 0
+
+    def record(self, held):
+        if held == self._held and self._count < MAX_RUN:
+            self._count += 1
+        else:
+            self._flush()
+            self._held = held
+            self._count = 1
+        self.frames += 1
+
+    def _flush(self):
+        if self._count:
+            self.runs.append(self._held)
+            self.runs.append(self._count)
+            self._count = 0
+
+    def finish(self, game):
+        """記録を終える: 最終フレームのチェックサムを残す"""
+        self._flush()
+        self._held = None
+        self.checksum = game.checksum()
+
+    def to_bytes(self):
+        runs = array("H", self.runs)
+        if self._count:
+            runs.extend((self._held, self._count))
+        if sys.byteorder == "big":
+            runs.byteswap()
+        return HEADER.pack(MAGIC, self.seed, self.frames, self.checksum) + zlib.compress(runs.tobytes(), 9)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """読み込んだリプレイ: seed と、1フレーム1要素の入力を返す inputs()"""
+
+    def __init__(self, seed, frames, checksum, runs):
+        self.seed = seed
+        self.frames = frames
+        self.checksum = checksum
+        self.runs = runs
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, seed, frames, checksum = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("リプレイファイルではありません")
+        runs = array("H")
+        runs.frombytes(zlib.decompress(data[HEADER.size:]))
+        if sys.byteorder == "big":
+            runs.byteswap()
+        return cls(seed, frames, checksum, runs)
+
+    def inputs(self):
+        runs = self.runs
+        for i in range(0, len(runs), 2):
+            held = runs[i]
+            for _ in range(runs[i + 1]):
+                yield held
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        return Replay.from_bytes(f.read())
@@ -2,6 +2,15 @@ import pyxel
 import random
 import math
 
+from bullet_store import OWNER_BOSS
+from projectile_store import ProjectileStore
+from trig_table import SwayCurve, deg, ring, spread
+from fire_control import LatencyProbe
+from particles import ParticlePool
+from starfield import Starfield, scatter
+from sweep_prune import SweepAndPrune
+from trail import Trail
+
 # -------------------------
 # Constants
 # -------------------------
@@ -12,6 +21,12 @@ BG_COLORS = [0, 1, 1, 2, 2, 3]
 DRAGON_SHOW_TIME = 300 # 10s @30fps
 ENDING_SHOW_TIME = 150 # 5s @30fps
 
+# 当たり判定のグループと、sweep_prune で候補を集める組 (敵とボスの弾は ProjectileStore でまとめて判定する)
+GROUP_PLAYER, GROUP_PLAYER_BULLET, GROUP_ENEMY, GROUP_BOSS = range(4)
+COLLISION_RULES = [
+    (GROUP_ENEMY, GROUP_PLAYER_BULLET), (GROUP_ENEMY, GROUP_PLAYER), (GROUP_BOSS, GROUP_PLAYER_BULLET),
+]
+
 # -------------------------
 # Bullet
 # -------------------------
@@ -39,82 +54,52 @@ class Bullet:
             pyxel.circ(int(self.x), int(self.y), 1, self.color)
             pyxel.pset(int(self.x), int(self.y), 7)
 
+def draw_enemy_bullets(bullets):
+    """敵とボスの弾 (ProjectileStore の type 列に弾の色を入れている)"""
+    x, y = bullets.xy()
+    for x, y, c in zip(x.astype(int).tolist(), y.astype(int).tolist(), bullets.type[:bullets.count].tolist()):
+        pyxel.circ(x, y, 1, c)
+        pyxel.pset(x, y, 7)
+
 # -------------------------
 # Explosion (particles)
 # -------------------------
-class Explosion:
-    def __init__(self, x, y, count=30):
-        self.particles = []
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(0.6, 3.5)
-            self.particles.append({
-                'x': x, 'y': y,
-                'dx': math.cos(angle) * speed,
-                'dy': math.sin(angle) * speed,
-                'color': random.choice([8, 9, 10, 11]),
-                'life': random.randint(10, 30),
-                'size': random.randint(1, 2)
-            })
-        self.active = True
+# パーティクルは particles.ParticlePool にまとめて持つ (速度は毎フレーム 0.96 倍に減衰)
+PARTICLE_CAPACITY = 1024
 
-    def update(self):
-        for p in self.particles:
-            p['x'] += p['dx']
-            p['y'] += p['dy']
-            p['dx'] *= 0.96
-            p['dy'] *= 0.96
-            p['life'] -= 1
-        self.particles = [p for p in self.particles if p['life'] > 0]
-        if not self.particles:
-            self.active = False
 
-    def draw(self):
-        for p in self.particles:
-            if p['life'] > 15:
-                c = p['color']
-            elif p['life'] > 5:
-                c = 7
-            else:
-                c = 0
-            if p['size'] == 2:
-                pyxel.rect(int(p['x']) - 1, int(p['y']) - 1, 2, 2, c)
-            else:
-                pyxel.pset(int(p['x']), int(p['y']), c)
+def draw_particles(particles):
+    for x, y, color, life, size in particles.live():
+        if life > 15:
+            c = color
+        elif life > 5:
+            c = 7
+        else:
+            c = 0
+        if size == 2:
+            pyxel.rect(x - 1, y - 1, 2, 2, c)
+        else:
+            pyxel.pset(x, y, c)
 
 # -------------------------
 # Background (stars + planet)
 # -------------------------
-class Star:
-    def __init__(self, speed_factor):
-        self.x = random.randint(0, SCREEN_W)
-        self.y = random.randint(0, SCREEN_H)
-        self.speed = random.uniform(0.08, 0.4) * speed_factor
-        self.brightness = random.choice([7, 10, 12])
-
-    def update(self):
-        self.x -= self.speed
-        if self.x < 0:
-            self.x = SCREEN_W
-            self.y = random.randint(0, SCREEN_H)
-            self.brightness = random.choice([7, 10, 12])
-
-    def draw(self):
-        pyxel.pset(int(self.x), int(self.y), self.brightness)
+# 星は層ごとにイメージバンクへ描いておき、層単位でスクロールさせる。
+# 元の星は1つずつ速さが違ったので、遠景・近景をそれぞれ速さ2段の層に分ける。
+STAR_COLORS = (7, 10, 12)
+STAR_LAYERS = [(15, 0.08), (15, 0.16), (15, 0.24), (15, 0.48)]  # (星の数, 速さ)
 
 class Background:
     def __init__(self):
-        self.stars_far = [Star(0.5) for _ in range(30)]
-        self.stars_near = [Star(1.5) for _ in range(30)]
+        self.stars = Starfield(SCREEN_W, SCREEN_H)
+        for count, speed in STAR_LAYERS:
+            self.stars.add_layer(scatter(count, SCREEN_W, SCREEN_H, STAR_COLORS), speed)
         self.planet_x = SCREEN_W + 60
         self.planet_y = random.randint(25, 90)
         self.planet_color = 5
 
     def update(self):
-        for s in self.stars_far:
-            s.update()
-        for s in self.stars_near:
-            s.update()
+        self.stars.update()
         self.planet_x -= 0.04
         if self.planet_x < -120:
             self.planet_x = SCREEN_W + random.randint(40, 120)
@@ -126,10 +111,26 @@ class Background:
         pyxel.circ(px, py, 15, self.planet_color)
         pyxel.circ(px - 5, py + 5, 12, (self.planet_color + 1) % 16)
         pyxel.line(px - 10, py + 10, px + 10, py - 10, (self.planet_color + 1) % 16)
-        for s in self.stars_far:
-            s.draw()
-        for s in self.stars_near:
-            s.draw()
+        self.stars.draw()
+
+# -------------------------
+# Exhaust
+# -------------------------
+# 噴射炎の粒は trail.Trail のリングバッファに持ち、life ごとの粒の形は起動時にイメージバンクへ描いておく
+EXHAUST_LIFE = 8
+PUFF_BANK = 2     # バンク 0, 1 は星空の層
+PUFF = 4
+
+def bake_puffs(img):
+    """life 1〜EXHAUST_LIFE の粒を img の上端に PUFF 間隔で並べて描く (0 は透明色)"""
+    img.rect(0, 0, PUFF * (EXHAUST_LIFE + 1), PUFF, 0)
+    for life in range(1, EXHAUST_LIFE + 1):
+        c = 8 if life > 4 else 9 if life > 2 else 10
+        img.circ(life * PUFF + 1, 1, 1, c)
+
+def draw_exhaust(trail):
+    for x, y, life in trail.puffs():
+        pyxel.blt(x - 1, y - 1, PUFF_BANK, life * PUFF, 0, PUFF, PUFF, 0)
 
 # -------------------------
 # Player
@@ -141,11 +142,12 @@ class Player:
         self.y = SCREEN_H // 2
         self.life = 4
         self.bullets = []
-        self.exhaust = []
+        self.exhaust = Trail(EXHAUST_LIFE, EXHAUST_LIFE)
         self.shot_timer = 0
         self.power = 1
+        self.fire_probe = LatencyProbe()   # ショットを押してから弾が出るまでのフレーム数
 
-        def update(self):
+    def update(self):
         dx = dy = 0
 
         # -----------------------------
@@ -159,6 +161,7 @@ class Player:
         # ---------------------------------
         # ★ スマホ操作（タッチ対応）
         # ---------------------------------
+        self.fire_probe.tick(pyxel.btn(pyxel.MOUSE_LEFT) and pyxel.mouse_x >= SCREEN_W // 2)
         if pyxel.btn(pyxel.MOUSE_LEFT):
             mx = pyxel.mouse_x
             my = pyxel.mouse_y
@@ -173,6 +176,7 @@ class Player:
             else:
                 self.shot_timer += 1
                 if self.shot_timer % 5 == 0:
+                    self.fire_probe.spawned()
                     if self.power == 1:
                         self.bullets.append(Bullet(self.x + 6, self.y, dx=3, color=11))
                     elif self.power == 2:
@@ -198,18 +202,12 @@ class Player:
                 b.update()
         self.bullets = [b for b in self.bullets if b is not None and b.active]
 
-        self.exhaust.append({'x': self.x - 6, 'y': self.y, 'life': 8, 'dy': random.uniform(-0.5, 0.5)})
-        for e in self.exhaust:
-            e['x'] -= 1.5
-            e['y'] += e['dy']
-            e['life'] -= 1
-        self.exhaust = [e for e in self.exhaust if e['life'] > 0]
+        self.exhaust.emit(self.x - 6, self.y, random.uniform(-0.5, 0.5))
+        self.exhaust.step(-1.5)
 
     def draw(self):
         px, py = self.x, self.y
-        for e in self.exhaust:
-            c = 8 if e['life'] > 4 else 9 if e['life'] > 2 else 10
-            pyxel.circ(e['x'], e['y'], 1, c)
+        draw_exhaust(self.exhaust)
         pyxel.rect(px - 5, py - 2, 7, 4, 13)
         pyxel.tri(px + 2, py, px - 5, py - 4, px - 5, py + 4, 7)
         pyxel.circ(px - 2, py, 2, 11)
@@ -224,26 +222,22 @@ class Player:
 # -------------------------
 class Enemy:
     SIZE = 6
+    SWAY = SwayCurve(0.1, 1.5)
     def __init__(self, x, y, stage):
         self.x = x
         self.y = y
         self.active = True
         self.timer = 0
         self.stage = stage
-        self.bullets = []
 
-    def update(self, player):
+    def update(self, player, bullets):
+        """bullets: 敵とボスの弾をまとめて持つ ProjectileStore (弾は撃った敵が消えても残る)"""
         self.timer += 1
         self.x -= 0.5 + (self.stage + 1) * 0.1 # stage=0 のときは1.1
-        self.y += math.sin(self.timer * 0.1) * 1.5
+        self.y += Enemy.SWAY(self.timer)
         if self.timer % 40 == 0:
             dy = (player.y - self.y) / 20
-            self.bullets.append(Bullet(self.x, self.y, dx=-2, dy=dy, color=8))
-        # update bullets safely
-        for b in self.bullets:
-            if b is not None and b.active:
-                b.update()
-        self.bullets = [b for b in self.bullets if b is not None and b.active]
+            bullets.spawn(self.x, self.y, -2, dy, type=8)
         if self.x < -10:
             self.active = False
 
@@ -254,14 +248,13 @@ class Enemy:
         pyxel.tri(px + 4, py, px, py - 4, px + 5, py - 5, 2)
         pyxel.tri(px + 4, py, px, py + 4, px + 5, py + 5, 2)
         pyxel.line(px - 4, py, px - 6, py, 8)
-        for b in self.bullets:
-            b.draw()
 
 # -------------------------
 # Boss (dragon head)
 # -------------------------
 class Boss:
     SIZE = 24
+    SWAY = SwayCurve(0.05, 10)
     # stage 0 (index 0) corresponds to Stage 1.
     # Stage 0, 1, 2, 3, 4, 5 (total 6 stages)
     HP_LIST = [5, 10, 15, 20, 30, 50] 
@@ -273,33 +266,27 @@ class Boss:
         self.y = SCREEN_H // 2 - 12
         self.stage = stage
         self.hp = Boss.HP_LIST[stage]
-        self.bullets = []
         self.active = True
         self.timer = 0
 
-    def update(self, player):
+    def update(self, player, bullets):
         self.timer += 1
-        self.y = SCREEN_H // 2 + math.sin(self.timer * 0.05) * 10
+        self.y = SCREEN_H // 2 + Boss.SWAY(self.timer)
         if self.stage == 5:
             if self.timer % 30 == 0:
-                for angle in [-15, -10, -5, 0, 5, 10, 15]:
-                    angle_rad = math.radians(angle) + math.pi
-                    self.bullets.append(Bullet(self.x - 5, self.y + 10, dx=3 * math.cos(angle_rad), dy=3 * math.sin(angle_rad), color=8))
+                # 7-way fan: -15..15 degrees around straight left
+                vx, vy = spread(deg(180), deg(5), 7, 3)
+                bullets.spawn_batch(self.x - 5, self.y + 10, vx, vy, type=8, owner=OWNER_BOSS)
             if self.timer % 60 == 0:
                 dy = (player.y - self.y) / 20
-                self.bullets.append(Bullet(self.x, self.y, dx=-2, dy=dy, color=9))
+                bullets.spawn(self.x, self.y, -2, dy, type=9, owner=OWNER_BOSS)
         else:
             if self.timer % 50 == 0:
-                for angle in [i * math.pi / 6 for i in range(12)]:
-                    self.bullets.append(Bullet(self.x, self.y, dx=2 * math.cos(angle), dy=2 * math.sin(angle), color=12))
+                vx, vy = ring(12, 2)
+                bullets.spawn_batch(self.x, self.y, vx, vy, type=12, owner=OWNER_BOSS)
             if self.timer % 20 == 0:
                 dy = (player.y - self.y) / 20
-                self.bullets.append(Bullet(self.x, self.y, dx=-3, dy=dy, color=8))
-        # update bullets safely
-        for b in self.bullets:
-            if b is not None and b.active:
-                b.update()
-        self.bullets = [b for b in self.bullets if b is not None and b.active]
+                bullets.spawn(self.x, self.y, -3, dy, type=8, owner=OWNER_BOSS)
 
     def draw(self):
         px, py = self.x, self.y
@@ -316,8 +303,6 @@ class Boss:
             pyxel.tri(px + 30, py - 20, px + 40, py - 30, px + 20, py - 15, 9)
             pyxel.circ(px + 20, py - 5, 3, 8)
             pyxel.rect(px - 15, py + 5, 5, 10, 8)
-        for b in self.bullets:
-            b.draw()
         max_hp = Boss.HP_LIST[self.stage]
         # HP bar (scale to 100 px width)
         if max_hp > 0:
@@ -371,6 +356,11 @@ class App:
     def __init__(self):
         pyxel.init(SCREEN_W, SCREEN_H, title="SHOOTING WAR: DRAGON AWAKENING", fps=30)
         self.background = Background()
+        bake_puffs(pyxel.images[PUFF_BANK])
+        self.sap = SweepAndPrune(COLLISION_RULES)
+        self.show_debug = False   # F1 で切り替え (ショットの遅れと当たり判定の候補数)
+        self.particles = ParticlePool(PARTICLE_CAPACITY, drag=0.96, speed=(0.6, 3.5), life=(10, 30),
+                                      colors=(8, 9, 10, 11), size=(1, 2))
         self.reset(is_initial_start=True)
         # Force start interlude to show stage 1 explanation text first.
         self.start_interlude(is_tutorial=True) 
@@ -380,6 +370,8 @@ class App:
         # core game
         self.player = Player()
         self.enemies = []
+        # 敵とボスの弾はどれも直進するので、位置は撃った回からの式で求める
+        self.enemy_bullets = ProjectileStore((-8, -8, SCREEN_W + 8, SCREEN_H + 8))
         self.powerups = []
         self.boss = None
         # Start at stage -1 to ensure the tutorial interlude (stage 0) happens first.
@@ -390,7 +382,7 @@ class App:
         self.ending = False
         self.show_title = is_initial_start
         self.title_timer = 0
-        self.explosions = []
+        self.particles.clear()
         if not hasattr(self, 'ranking'):
             self.ranking = []
         self.title_particles = [TitleParticle() for _ in range(40)]
@@ -436,6 +428,9 @@ class App:
             intensity = min(int(fade), 30)
             pyxel.rect(int(cx - 18*scale), int(cy - 18*scale), int(36*scale), int(36*scale), 7)
 
+    def explode(self, x, y, count=30):
+        self.particles.burst(x, y, count)
+
     def clear_all_enemies(self, create_explosion=True):
         """Power4 の効果: 画面上の敵をすべて消す"""
         removed = 0
@@ -444,15 +439,10 @@ class App:
                 e.active = False
                 removed += 1
                 if create_explosion:
-                    self.explosions.append(Explosion(e.x, e.y, count=18))
+                    self.explode(e.x, e.y, count=18)
                     self.score += 5  # 小さいボーナス
-        # also clear boss bullets (but not the boss itself)
-        if self.boss is not None:
-            for b in list(self.boss.bullets):
-                b.active = False
-        # optionally clear enemy bullets
-        for e in list(self.enemies):
-            e.bullets = []
+        # also clear enemy and boss bullets (but not the boss itself)
+        self.enemy_bullets.clear()
         # remove them from list
         self.enemies = [e for e in self.enemies if e is not None and e.active]
         return removed
@@ -545,6 +535,8 @@ class App:
 
     def update(self):
         self.background.update()
+        if pyxel.btnp(pyxel.KEY_F1):
+            self.show_debug = not self.show_debug
 
         # TITLE handling
         if self.show_title:
@@ -626,34 +618,39 @@ class App:
             y = random.randint(10, SCREEN_H - 10)
             self.powerups.append(PowerUp(SCREEN_W, y))
 
-        # update enemies and collisions
-        for e in list(self.enemies):
-            if e is not None and e.active:
-                e.update(self.player)
-                # player bullets vs enemy
-                for b in list(self.player.bullets):
-                    if b is None or not b.active:
-                        continue
-                    if abs(e.x - b.x) < 4 and abs(e.y - b.y) < 4:
-                        e.active = False
-                        b.active = False
-                        self.score += 10
-                        self.explosions.append(Explosion(e.x, e.y))
-                # enemy bullets vs player
-                for eb in list(e.bullets):
-                    if eb is not None and eb.active and abs(self.player.x - eb.x) < 4 and abs(self.player.y - eb.y) < 4:
-                        eb.active = False
-                        self.player.life -= 1
-                        self.explosions.append(Explosion(self.player.x, self.player.y))
-                        if self.player.life <= 0:
-                            self.game_over = True
-                # collision body vs player
-                if abs(e.x - self.player.x) < 6 and abs(e.y - self.player.y) < 6:
-                    e.active = False
-                    self.player.life -= 1
-                    self.explosions.append(Explosion(self.player.x, self.player.y))
-                    if self.player.life <= 0:
-                        self.game_over = True
+        # update enemies and boss, then collect every collision pair in one sweep on x
+        movers = [e for e in self.enemies if e is not None and e.active]
+        for e in movers:
+            e.update(self.player, self.enemy_bullets)
+        boss = self.boss if self.boss is not None and getattr(self.boss, 'active', False) else None
+        if boss is not None:
+            boss.update(self.player, self.enemy_bullets)
+        hits = self.collect_collisions(movers, boss)
+        # enemy and boss bullets: advance the shared clock; culling only runs when the next bullet expires
+        self.enemy_bullets.step()
+        self.enemy_bullets.cull()
+
+        # player bullets vs enemy
+        for e, b in hits[(GROUP_ENEMY, GROUP_PLAYER_BULLET)]:
+            if b.active and abs(e.x - b.x) < 4 and abs(e.y - b.y) < 4:
+                e.active = False
+                b.active = False
+                self.score += 10
+                self.explode(e.x, e.y)
+        # enemy and boss bullets vs player
+        for _ in range(self.enemy_bullets.hit_test(self.player.x, self.player.y, 4)):
+            self.player.life -= 1
+            self.explode(self.player.x, self.player.y)
+            if self.player.life <= 0:
+                self.game_over = True
+        # collision body vs player
+        for e, _ in hits[(GROUP_ENEMY, GROUP_PLAYER)]:
+            if abs(e.x - self.player.x) < 6 and abs(e.y - self.player.y) < 6:
+                e.active = False
+                self.player.life -= 1
+                self.explode(self.player.x, self.player.y)
+                if self.player.life <= 0:
+                    self.game_over = True
 
         # cleanup enemies
         self.enemies = [e for e in self.enemies if e is not None and e.active]
@@ -675,9 +672,7 @@ class App:
         self.powerups = [p for p in self.powerups if p is not None and p.active]
 
         # explosion update
-        for ex in self.explosions:
-            ex.update()
-        self.explosions = [ex for ex in self.explosions if ex.active]
+        self.particles.update()
 
         # Boss spawn condition:
         # if we've spawned all scheduled enemies and no enemies remain on screen, bring boss after a delay
@@ -687,23 +682,27 @@ class App:
             if self.stage_timer > 60:
                 self.boss = Boss(self.stage)
 
-        # boss update & bullet collisions (only if boss exists)
-        if self.boss is not None and getattr(self.boss, 'active', False):
-            self.boss.update(self.player)
+        # boss collisions (pairs were collected above; a boss that appeared this frame moves and collects its own)
+        if boss is None and self.boss is not None and getattr(self.boss, 'active', False):
+            boss = self.boss
+            boss.update(self.player, self.enemy_bullets)
+            hits = self.collect_collisions([], boss)
+        if boss is not None and self.boss is boss:
             # player's bullets vs boss
-            for b in list(self.player.bullets):
-                if b is None or not b.active:
+            for _, b in hits[(GROUP_BOSS, GROUP_PLAYER_BULLET)]:
+                if not b.active:
                     continue
                 if (self.boss.x <= b.x <= self.boss.x + Boss.SIZE and
                     self.boss.y <= b.y <= self.boss.y + Boss.SIZE):
                     b.active = False
                     self.boss.hp -= 1
-                    self.explosions.append(Explosion(b.x, b.y, count=6))
+                    self.explode(b.x, b.y, count=6)
                     if self.boss.hp <= 0:
-                        self.explosions.append(Explosion(self.boss.x + Boss.SIZE//2, self.boss.y + Boss.SIZE//2, count=100))
+                        self.explode(self.boss.x + Boss.SIZE//2, self.boss.y + Boss.SIZE//2, count=100)
                         self.boss.active = False
-                        # boss destroyed -> stage clear
+                        # boss destroyed -> stage clear (its bullets and any stray ones go with it)
                         self.boss = None
+                        self.enemy_bullets.clear()
                         # stage up logic is now inside start_interlude, which is called below
                         self.stage_timer = 0
                         self.score += 500
@@ -718,15 +717,21 @@ class App:
                             self.ranking.sort(reverse=True)
                             self.ranking = self.ranking[:3]
                         break
-            # boss bullets vs player
-            if self.boss is not None:  # may have become None after break
-                for bb in list(self.boss.bullets):
-                    if bb is not None and bb.active and abs(self.player.x - bb.x) < 4 and abs(self.player.y - bb.y) < 4:
-                        bb.active = False
-                        self.player.life -= 1
-                        self.explosions.append(Explosion(self.player.x, self.player.y))
-                        if self.player.life <= 0:
-                            self.game_over = True
+
+    def collect_collisions(self, movers, boss):
+        """当たり判定の候補の組を x の sweep でまとめて集める (箱は正確な判定より少し大きめ)"""
+        sap = self.sap
+        sap.begin()
+        p = self.player
+        sap.add(p, p.x - 4, p.y - 4, p.x + 4, p.y + 4, GROUP_PLAYER)
+        for b in p.bullets:
+            if b is not None and b.active:
+                sap.add(b, b.x, b.y, b.x, b.y, GROUP_PLAYER_BULLET)
+        for e in movers:
+            sap.add(e, e.x - 4, e.y - 4, e.x + 4, e.y + 4, GROUP_ENEMY)
+        if boss is not None:
+            sap.add(boss, boss.x, boss.y, boss.x + Boss.SIZE, boss.y + Boss.SIZE, GROUP_BOSS)
+        return sap.pairs()
 
     def draw(self):
         # Title screen
@@ -861,9 +866,7 @@ class App:
         pyxel.cls(BG_COLORS[min(self.stage + 1, len(BG_COLORS) - 1)]) 
         self.background.draw()
 
-        for ex in self.explosions:
-            if ex is not None and ex.active:
-                ex.draw()
+        draw_particles(self.particles)
 
         for p in self.powerups:
             if p is not None and p.active:
@@ -875,8 +878,12 @@ class App:
         for e in self.enemies:
             if e is not None and e.active:
                 e.draw()
+        draw_enemy_bullets(self.enemy_bullets)
 
         self.player.draw()
+        if self.show_debug:
+            pyxel.text(4, SCREEN_H - 22, f"SAP {self.sap.candidates}/{self.sap.brute} EB {len(self.enemy_bullets)}", 11)
+            pyxel.text(4, SCREEN_H - 16, self.player.fire_probe.label(), 11)
 
         # -------------------
         # HUD (Head-Up Display)
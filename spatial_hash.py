@@ -0,0 +1,78 @@
+# spatial_hash.py
+# 一様グリッド (空間ハッシュ) による衝突判定のブロードフェーズ
+# 毎フレーム clear() してから弾や敵を矩形で登録し、同じセルに入った組だけを候補として返す。
+# pyxel には依存しない。
+
+
+class SpatialHash:
+    """x, y, w, h の領域を cell ピクセル四方のセルに分割した衝突インデックス
+
+    領域外の座標は端のセルに寄せて登録するので、画面外に少しはみ出した弾も漏れない。
+    """
+
+    def __init__(self, x, y, w, h, cell=16):
+        self.x = x
+        self.y = y
+        self.cell = cell
+        self.cols = max(1, -(-w // cell))
+        self.rows = max(1, -(-h // cell))
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.used = []          # 何か入っているセルの番号 (clear を速くするため)
+        self.pair_count = 0     # 直近の pairs() が返した候補ペア数
+        self.entry_count = 0    # 登録数
+
+    def clear(self):
+        cells = self.cells
+        for i in self.used:
+            cells[i].clear()
+        self.used.clear()
+        self.entry_count = 0
+
+    def _col(self, x):
+        c = int((x - self.x) // self.cell)
+        return 0 if c < 0 else self.cols - 1 if c >= self.cols else c
+
+    def _row(self, y):
+        r = int((y - self.y) // self.cell)
+        return 0 if r < 0 else self.rows - 1 if r >= self.rows else r
+
+    def insert(self, obj, x0, y0, x1, y1, group=0):
+        """obj を矩形 (x0, y0)-(x1, y1) が掛かるすべてのセルに登録する"""
+        c0, c1 = self._col(x0), self._col(x1)
+        r0, r1 = self._row(y0), self._row(y1)
+        entry = (obj, group, c0, r0)
+        cells = self.cells
+        cols = self.cols
+        for r in range(r0, r1 + 1):
+            base = r * cols
+            for c in range(c0, c1 + 1):
+                bucket = cells[base + c]
+                if not bucket:
+                    self.used.append(base + c)
+                bucket.append(entry)
+        self.entry_count += 1
+
+    def pairs(self, group_a, group_b):
+        """group_a と group_b の候補ペア (a, b) を重複なしで返す
+
+        2つの矩形が複数セルを共有していても、共有範囲の左上のセルでだけペアを出す。
+        """
+        result = []
+        cells = self.cells
+        cols = self.cols
+        for i in self.used:
+            bucket = cells[i]
+            if len(bucket) < 2:
+                continue
+            r, c = divmod(i, cols)
+            a_list = [en for en in bucket if en[1] == group_a]
+            if not a_list:
+                continue
+            for b_obj, b_group, bc0, br0 in bucket:
+                if b_group != group_b:
+                    continue
+                for a_obj, _, ac0, ar0 in a_list:
+                    if (ac0 if ac0 > bc0 else bc0) == c and (ar0 if ar0 > br0 else br0) == r:
+                        result.append((a_obj, b_obj))
+        self.pair_count = len(result)
+        return result
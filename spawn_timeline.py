@@ -0,0 +1,52 @@
+# spawn_timeline.py
+# ステージの敵の出現表
+# ステージを (frame, 種類, y, 並び) の出現の列で書き、読み込み時に heapq で frame 順のヒープにしておく。
+# 更新ごとに出現の条件を全部調べる代わりに、先頭の frame が来たときだけ取り出す (1件 O(log n))。
+# y が None なら出現するときに呼び出し側が乱数で決める。並び (pattern) は1件で出す敵の数と、
+# 先頭からの位置のずれ (dx, dy)。pyxel には依存しない。
+
+import heapq
+
+PATTERNS = {
+    "single": ((0, 0),),
+    "column": ((0, -12), (0, 0), (0, 12)),
+    "line": ((0, 0), (16, 0), (32, 0)),
+    "vee": ((0, 0), (10, -10), (10, 10), (20, -20), (20, 20)),
+}
+
+
+def every(start, stop, step, type, y=None, pattern="single"):
+    """start から step ごとに stop 未満まで同じ出現を並べる"""
+    return [(frame, type, y, pattern) for frame in range(start, stop, step)]
+
+
+def compile_timeline(events):
+    """(frame, 種類, y, 並び) の列を frame 順のヒープにする。同じ frame の出現は書いた順に出る"""
+    heap = []
+    for i, (frame, type, y, pattern) in enumerate(events):
+        if pattern not in PATTERNS:
+            raise ValueError(f"unknown spawn pattern: {pattern}")
+        heap.append((frame, i, type, y, pattern))
+    heapq.heapify(heap)
+    return heap
+
+
+class SpawnQueue:
+    """compile_timeline() したヒープを1ステージ分取り出していくキュー (元のヒープは書き換えない)"""
+
+    def __init__(self, compiled):
+        self.heap = list(compiled)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def next_frame(self):
+        """次の出現の frame (残っていなければ None)"""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, frame):
+        """frame までに来た出現を (種類, y, 並び) で順に返す"""
+        heap = self.heap
+        while heap and heap[0][0] <= frame:
+            _, _, type, y, pattern = heapq.heappop(heap)
+            yield type, y, pattern
@@ -0,0 +1,37 @@
+# stage_data.py
+# ファイルに書いたステージのデータ (出現表・ボスの強さ・背景色・BGM) の読み込み
+# ステージごとに stageN.json を置き、初めて使うときに1度だけ読んで compile した形をキャッシュする。
+# 2周目以降や同じステージのやり直しではファイルを読み直さない。次のステージは prefetch() で
+# クリア後の待ち時間に読んでおけば、ステージの始まりで読み込みの手間がかからない。pyxel には依存しない。
+
+import json
+import os
+
+
+class StageLoader:
+    """directory/stage{n+1}.json を読んで compile(raw) した物をステージ番号 n ごとに覚える"""
+
+    def __init__(self, directory, compile):
+        self.directory = directory
+        self.compile = compile
+        self.cache = {}
+        self.loads = 0         # ファイルを読んだ回数
+
+    def path(self, stage):
+        return os.path.join(self.directory, f"stage{stage + 1}.json")
+
+    def get(self, stage):
+        """ステージ n のデータ (まだなら読んで compile する)"""
+        data = self.cache.get(stage)
+        if data is None:
+            with open(self.path(stage), encoding="utf-8") as f:
+                raw = json.load(f)
+            data = self.compile(raw)
+            self.cache[stage] = data
+            self.loads += 1
+        return data
+
+    def prefetch(self, stage):
+        """ステージ n をまだ読んでいなければ今読んでおく (ファイルがなければ何もしない)"""
+        if stage not in self.cache and os.path.exists(self.path(stage)):
+            self.get(stage)
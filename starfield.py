@@ -0,0 +1,84 @@
+# starfield.py
+# 多重スクロールの星空
+# 層ごとに星を起動時に1度だけイメージバンクの帯へ描いておき、毎フレームはスクロール量だけを進めて
+# つなぎ目をまたぐ2回の blt で描く (星1つごとの座標更新と pset をなくす)。
+
+import random
+
+import pyxel
+
+BANK_H = 256
+
+
+def scatter(count, w, h, colors, rng=random):
+    """w × h の範囲にばらまいた星 (x, y, 色) のリスト"""
+    return [(rng.randrange(w), rng.randrange(h), rng.choice(colors)) for _ in range(count)]
+
+
+class StarLayer:
+    """1枚の星の層: イメージバンク bank の (0, v) から w × h の帯を使う
+
+    speed は1フレームあたりの移動量。vertical が False なら左へ、True なら下へ流れて端で折り返す。
+    """
+
+    def __init__(self, bank, v, w, h, stars, speed, vertical=False, colkey=0):
+        self.bank = bank
+        self.v = v
+        self.w = w
+        self.h = h
+        self.speed = speed
+        self.vertical = vertical
+        self.colkey = colkey
+        self.offset = 0.0
+
+        img = pyxel.images[bank]
+        img.rect(0, v, w, h, colkey)
+        for x, y, col in stars:
+            img.pset(x % w, v + y % h, col)
+
+    def update(self):
+        self.offset = (self.offset + self.speed) % (self.h if self.vertical else self.w)
+
+    def draw(self, x=0, y=0):
+        o = int(self.offset)
+        bank, v, w, h, colkey = self.bank, self.v, self.w, self.h, self.colkey
+        if self.vertical:
+            # 帯の下から o 行を画面の上端に、残りをその下に
+            pyxel.blt(x, y + o, bank, 0, v, w, h - o, colkey)
+            if o:
+                pyxel.blt(x, y, bank, 0, v + h - o, w, o, colkey)
+        else:
+            # 帯の左から o 列を画面の右端に、残りをその左に
+            pyxel.blt(x, y, bank, o, v, w - o, h, colkey)
+            if o:
+                pyxel.blt(x + w - o, y, bank, 0, v, o, h, colkey)
+
+
+class Starfield:
+    """StarLayer の組。帯はバンク bank の上から順に詰め、入りきらなければ次のバンクを使う"""
+
+    def __init__(self, w, h, bank=0, vertical=False, colkey=0):
+        self.w = w
+        self.h = h
+        self.vertical = vertical
+        self.colkey = colkey
+        self._bank = bank
+        self._v = 0
+        self.layers = []
+
+    def add_layer(self, stars, speed):
+        if self._v + self.h > BANK_H:
+            self._bank += 1
+            self._v = 0
+        layer = StarLayer(self._bank, self._v, self.w, self.h, stars, speed, self.vertical, self.colkey)
+        self._v += self.h
+        self.layers.append(layer)
+        return layer
+
+    def update(self):
+        for layer in self.layers:
+            layer.update()
+
+    def draw(self, x=0, y=0):
+        for layer in self.layers:
+            layer.draw(x, y)
@@ -0,0 +1,102 @@
+# sweep_prune.py
+# x 軸の sort-and-sweep による当たり判定のブロードフェーズ
+# 横スクロールでは物の x の並びがフレーム間でほとんど変わらないので、前のフレームの並びを残しておき
+# そこへ今のフレームの座標を入れて並べ直す (Python の sort は並びかけの列をほぼ一度の走査で整列できる)。
+# 並んだ箱を左から見て、x が重なる範囲だけを調べ、指定したグループの組のうち y も重なるものを候補として返す。
+# 候補は箱どうしが重なっているだけなので、正確な判定は呼び出し側で行う。
+# 組は x の並びではなく add() した順 (a の順、同じ a なら b の順) で返すので、呼び出し側の判定の順は
+# 「a のリストを回し、その中で b のリストを回す」二重ループと同じになる。
+# 前のフレームの箱は物の id で引く表に持ち、物の側には何も書き込まない。pyxel には依存しない。
+
+from operator import itemgetter
+
+X0, Y0, X1, Y1, GROUP, OBJ, STAMP, INDEX = range(8)
+
+_by_x0 = itemgetter(X0)
+_by_index = itemgetter(0, 1)
+
+
+class SweepAndPrune:
+    """rules に挙げたグループの組 (a, b) について、箱が重なる物の組を1回の走査で集める
+
+    フレームごとに begin() → add() を全部 → pairs()。candidates はこのフレームで x が重なって調べた組の数、
+    brute は総当たりなら調べる組の数 (比較用)。
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._against = {}
+        for a, b in self.rules:
+            self._against.setdefault(a, set()).add(b)
+            self._against.setdefault(b, set()).add(a)
+        self._order = []       # 前のフレームの x 順の箱
+        self._boxes = {}       # id(物) → 前のフレームの箱
+        self._added = []
+        self._index = 0
+        self._counts = {}
+        self._frame = 0
+        self.candidates = 0
+        self.brute = 0
+
+    def begin(self):
+        self._frame += 1
+        self._added = []
+        self._index = 0
+        self._counts = {}
+
+    def add(self, obj, x0, y0, x1, y1, group):
+        """obj の箱を登録する。前のフレームにも登録した obj は同じ箱を使い回す"""
+        box = self._boxes.get(id(obj))
+        if box is None or box[OBJ] is not obj or box[STAMP] != self._frame - 1:
+            box = [x0, y0, x1, y1, group, obj, self._frame, self._index]
+            self._added.append(box)
+        else:
+            box[X0] = x0; box[Y0] = y0; box[X1] = x1; box[Y1] = y1
+            box[GROUP] = group; box[STAMP] = self._frame; box[INDEX] = self._index
+        self._index += 1
+        self._counts[group] = self._counts.get(group, 0) + 1
+
+    def pairs(self):
+        """{(a, b): [(a の物, b の物), ...]} を rules の組ごとに、add() した順に並べて返す"""
+        frame = self._frame
+        order = [box for box in self._order if box[STAMP] == frame]
+        order += self._added
+        order.sort(key=_by_x0)
+        self._order = order
+        self._boxes = {id(box[OBJ]): box for box in order}
+
+        result = {rule: [] for rule in self.rules}
+        against = self._against
+        candidates = 0
+        n = len(order)
+        for i in range(n):
+            a = order[i]
+            targets = against.get(a[GROUP])
+            if not targets:
+                continue
+            ax1, ay0, ay1, ga = a[X1], a[Y0], a[Y1], a[GROUP]
+            j = i + 1
+            while j < n:
+                b = order[j]
+                if b[X0] > ax1:
+                    break
+                j += 1
+                gb = b[GROUP]
+                if gb not in targets:
+                    continue
+                candidates += 1
+                if b[Y0] > ay1 or b[Y1] < ay0:
+                    continue
+                if (ga, gb) in result:
+                    result[(ga, gb)].append((a[INDEX], b[INDEX], a[OBJ], b[OBJ]))
+                if ga != gb and (gb, ga) in result:
+                    result[(gb, ga)].append((b[INDEX], a[INDEX], b[OBJ], a[OBJ]))
+
+        for rule, found in result.items():
+            found.sort(key=_by_index)
+            result[rule] = [(oa, ob) for _, _, oa, ob in found]
+
+        counts = self._counts
+        self.candidates = candidates
+        self.brute = sum(counts.get(a, 0) * counts.get(b, 0) for a, b in self.rules)
+        return result
@@ -0,0 +1,55 @@
+# test_arena.py
+# Arena をただのリストと同じ手順で増やしたり消したりして比べる (古いハンドルが無効になることも確かめる)
+
+import random
+
+from arena import Arena
+
+
+def test_matches_list_and_invalidates_stale_handles():
+    rng = random.Random(7)
+    arena = Arena()
+    ref = []            # 追加した順の (ハンドル, 中身)
+    stale = []          # 消したもののハンドル
+    for i in range(5000):
+        op = rng.random()
+        if ref and op < 0.45:
+            h, item = ref.pop(rng.randrange(len(ref)))
+            assert arena.remove(h)
+            stale.append(h)
+        elif op < 0.46:
+            arena.clear()
+            stale += [h for h, _ in ref]
+            ref = []
+        elif op < 0.55:
+            arena.compact()
+        else:
+            item = object()
+            ref.append((arena.add(item), item))
+
+        assert len(arena) == len(ref)
+        assert list(arena.items()) == ref
+        assert list(arena) == [item for _, item in ref]
+        for h, item in ref:
+            assert arena.alive(h) and arena.get(h) is item
+        for h in stale[-20:]:
+            # スロットが使い回されても、古いハンドルは世代が違うので新しい中身を指さない
+            assert not arena.alive(h) and arena.get(h) is None and not arena.remove(h)
+
+
+def test_items_snapshot_allows_removal():
+    arena = Arena()
+    handles = [arena.add(n) for n in range(10)]
+    seen = []
+    for h, n in arena.items():
+        seen.append(n)
+        if n % 2 == 0:
+            arena.remove(h)
+        if n == 3:
+            arena.add(10)           # 写しなので、回している途中に足したものは回ってこない
+    assert seen == list(range(10))
+    assert list(arena) == [1, 3, 5, 7, 9, 10]
+    arena.compact()
+    assert list(arena) == [1, 3, 5, 7, 9, 10]
+    assert not any(arena.alive(h) for h in handles[::2])
+    assert [arena.get(h) for h in handles[1::2]] == [1, 3, 5, 7, 9]
@@ -0,0 +1,42 @@
+# test_attract.py
+# デモを記録して読み直し、更新ごとの (種類, x, y) が元どおりになるか調べる
+
+import random
+
+import pytest
+
+from attract import (ENEMY_TYPES, KIND_GROUND, MAX_PER_FRAME, OFFSET, AttractDemo, AttractRecorder,
+                     load_attract)
+
+
+def _clamp(v):
+    return max(0, min(255, int(v) + OFFSET)) - OFFSET
+
+
+def test_round_trip(tmp_path):
+    rng = random.Random(12)
+    rec = AttractRecorder()
+    expected = []
+    for _ in range(200):
+        grounds = [{"x": rng.uniform(-40, 200), "y": rng.uniform(-40, 240)} for _ in range(rng.randrange(4))]
+        enemies = [{"kind": rng.randrange(len(ENEMY_TYPES)), "x": rng.uniform(-40, 200), "y": rng.uniform(-40, 240)}
+                   for _ in range(rng.choice((0, 3, 60)))]       # 60 体の回は MAX_PER_FRAME で切られる
+        rec.record(enemies, grounds)
+        ents = [(KIND_GROUND, _clamp(g["x"]), _clamp(g["y"])) for g in grounds]
+        ents += [(e["kind"], _clamp(e["x"]), _clamp(e["y"])) for e in enemies]
+        expected.append(ents[:MAX_PER_FRAME])
+    path = tmp_path / "demo.dat"
+    rec.save(path)
+
+    demo = load_attract(path)
+    assert demo.frames == len(expected)
+    for ents in expected + expected[:3]:              # 最後まで行くと先頭に戻る
+        assert list(demo.entities()) == ents
+        demo.advance()
+
+
+def test_missing_and_bad_files(tmp_path):
+    assert load_attract(tmp_path / "none.dat") is None
+    data = AttractRecorder().to_bytes()
+    with pytest.raises(ValueError):
+        AttractDemo.from_bytes(b"XXXX" + data[4:])
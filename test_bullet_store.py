@@ -0,0 +1,76 @@
+# test_bullet_store.py
+# BulletStore を「弾のリストを1発ずつ処理する」素朴な実装と同じ手順で動かして比べる
+
+import random
+
+from bullet_store import BulletStore, OWNER_BOSS, OWNER_ENEMY
+
+
+def _step(ref, owner):
+    for b in ref:
+        if owner is None or b[4] == owner:
+            b[0] += b[2]
+            b[1] += b[3]
+
+
+def _take_hits(ref, tx, ty, rx, ry):
+    hit = []
+    for x, y in zip(tx, ty):
+        for b in ref:
+            if abs(b[0] - x) < rx and abs(b[1] - y) < ry:
+                ref.remove(b)
+                hit.append(True)
+                break
+        else:
+            hit.append(False)
+    return hit
+
+
+def test_matches_list_reference():
+    rng = random.Random(3)
+    store = BulletStore(4)          # 小さく始めて容量の広げ直しも通す
+    ref = []                        # [x, y, dx, dy, owner]
+    for _ in range(400):
+        op = rng.random()
+        if op < 0.3:
+            b = [rng.uniform(0, 160), rng.uniform(0, 120), rng.uniform(-3, 3), rng.uniform(-3, 3),
+                 rng.choice((OWNER_ENEMY, OWNER_BOSS))]
+            store.spawn(*b[:4], owner=b[4])
+            ref.append(b)
+        elif op < 0.4:
+            x, y = rng.uniform(0, 160), rng.uniform(0, 120)
+            dx = [rng.uniform(-3, 3) for _ in range(rng.randrange(6))]
+            dy = [rng.uniform(-3, 3) for _ in dx]
+            store.spawn_batch(x, y, dx, dy, owner=OWNER_BOSS)
+            ref += [[x, y, vx, vy, OWNER_BOSS] for vx, vy in zip(dx, dy)]
+        elif op < 0.6:
+            owner = rng.choice((None, OWNER_ENEMY, OWNER_BOSS))
+            store.step(owner)
+            _step(ref, owner)
+        elif op < 0.7:
+            store.cull(0, 0, 160, 120)
+            ref[:] = [b for b in ref if 0 <= b[0] <= 160 and 0 <= b[1] <= 120]
+        elif op < 0.8:
+            px, py = rng.uniform(0, 160), rng.uniform(0, 120)
+            before = len(ref)
+            ref[:] = [b for b in ref if not (abs(b[0] - px) < 12 and abs(b[1] - py) < 8)]
+            assert store.hit_test(px, py, 12, 8) == before - len(ref)
+        elif op < 0.9:
+            tx = [rng.uniform(0, 160) for _ in range(5)]
+            ty = [rng.uniform(0, 120) for _ in range(5)]
+            assert store.take_hits(tx, ty, 10, 10).tolist() == _take_hits(ref, tx, ty, 10, 10)
+        else:
+            store.set_owner(OWNER_ENEMY)
+            for b in ref:
+                b[4] = OWNER_ENEMY
+        assert len(store) == len(ref)
+        assert store.positions() == [(b[0], b[1]) for b in ref]
+        assert store.owner[:store.count].tolist() == [b[4] for b in ref]
+
+
+def test_positions_is_a_list():
+    store = BulletStore()
+    store.spawn(1.0, 2.0, 0.0, 0.0)
+    pos = store.positions()
+    assert pos == [(1.0, 2.0)]
+    assert list(pos) == list(pos)
@@ -0,0 +1,52 @@
+# test_fire_control.py
+# FireControl の撃つ回と LatencyProbe の遅れを、押した回から数える素朴な実装と比べる
+
+import random
+
+from fire_control import FireControl, LatencyProbe
+
+
+def test_fire_control_matches_reference():
+    rng = random.Random(6)
+    ctl = FireControl()
+    last = None                    # 最後に撃った回 (離したら忘れない: クールダウンは離しても減る)
+    held = False
+    for t in range(3000):
+        if rng.random() < 0.1:
+            held = not held
+        interval = 6 if t < 1500 else 12
+        want = held and (last is None or t - last >= interval)
+        if want:
+            last = t
+        assert ctl.update(held, interval) == want
+    ctl.reset()
+    assert ctl.update(True, 12)
+
+
+def test_latency_probe_counts_from_press():
+    rng = random.Random(8)
+    probe = LatencyProbe(window=16)
+    held = False
+    pressed_at = None
+    lats = []
+    for t in range(1, 3000):
+        new_held = rng.random() < 0.7 if held else rng.random() < 0.1
+        if new_held and not held:
+            pressed_at = t
+        elif not new_held:
+            pressed_at = None
+        held = new_held
+        probe.tick(held)
+        # 全体のカウンタに合わせて撃つ古い連射 (押した瞬間には出ないことがある)
+        if held and t % 5 == 0:
+            probe.spawned()
+            if pressed_at is not None:
+                lats.append(t - pressed_at)
+                pressed_at = None
+    assert probe.count == len(lats)
+    assert probe.max == max(lats)
+    assert list(probe.samples) == lats[-16:]
+    assert probe.last == lats[-1]
+    assert probe.average() == sum(lats[-16:]) / 16
+    assert probe.label().startswith(f"LAT {lats[-1]} ")
+    assert LatencyProbe().label() == "LAT --"
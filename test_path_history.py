@@ -0,0 +1,28 @@
+# test_path_history.py
+# PathHistory の d 回前の位置を、動いた位置を全部リストに残す素朴な実装と比べる
+
+import random
+
+from path_history import PathHistory
+
+
+def test_matches_full_list():
+    rng = random.Random(10)
+    size = 33
+    path = PathHistory(size, 50.0, 60.0)
+    ref = [(50.0, 60.0)]
+    out = [0.0, 0.0]
+    x, y = 50.0, 60.0
+    for t in range(2000):
+        if rng.random() < 0.6:              # 止まっている回は記録されない
+            x += rng.choice((-1.5, 0, 1.5))
+            y += rng.choice((-1.5, 0, 1.5))
+        path.record(x, y)
+        if (x, y) != ref[-1]:
+            ref.append((x, y))
+        if t == 1000:
+            path.reset(x, y)
+            ref = [(x, y)]
+        for delay in (0, 1, 8, 16, size - 1):
+            path.sample_into(out, delay)
+            assert tuple(out) == ref[max(0, len(ref) - 1 - delay)]
@@ -0,0 +1,69 @@
+# test_spatial_hash.py
+# SpatialHash.pairs() を総当たりの矩形判定と比べる
+
+import random
+
+from spatial_hash import SpatialHash
+
+
+def _rects(rng, n, group):
+    out = []
+    for i in range(n):
+        x = rng.uniform(-20, 180)
+        y = rng.uniform(-20, 140)
+        w = rng.uniform(1, 24)
+        h = rng.uniform(1, 24)
+        out.append(((group, i), x, y, x + w, y + h))
+    return out
+
+
+def _overlap(a, b):
+    return not (a[3] < b[1] or b[3] < a[1] or a[4] < b[2] or b[4] < a[2])
+
+
+def _cells(sh, r):
+    return sh._col(r[1]), sh._row(r[2]), sh._col(r[3]), sh._row(r[4])
+
+
+def test_pairs_match_brute_force():
+    rng = random.Random(1)
+    sh = SpatialHash(0, 0, 160, 120, cell=16)
+    for _ in range(50):
+        sh.clear()
+        bullets = _rects(rng, 40, 0)
+        enemies = _rects(rng, 20, 1)
+        for obj, x0, y0, x1, y1 in bullets:
+            sh.insert(obj, x0, y0, x1, y1, 0)
+        for obj, x0, y0, x1, y1 in enemies:
+            sh.insert(obj, x0, y0, x1, y1, 1)
+        got = sh.pairs(0, 1)
+        assert len(got) == len(set(got)), "同じ組を2度返した"
+
+        # セルの範囲が重なる組がちょうど候補になる
+        expected = set()
+        for a in bullets:
+            ac0, ar0, ac1, ar1 = _cells(sh, a)
+            for b in enemies:
+                bc0, br0, bc1, br1 = _cells(sh, b)
+                if ac0 <= bc1 and bc0 <= ac1 and ar0 <= br1 and br0 <= ar1:
+                    expected.add((a[0], b[0]))
+        assert set(got) == expected
+        assert sh.pair_count == len(got)
+        assert sh.entry_count == len(bullets) + len(enemies)
+
+        # 本当に重なる組は必ず候補に入っている
+        for a in bullets:
+            for b in enemies:
+                if _overlap(a, b):
+                    assert (a[0], b[0]) in expected
+
+
+def test_clear_forgets_previous_frame():
+    sh = SpatialHash(0, 0, 64, 64, cell=16)
+    sh.insert("a", 1, 1, 4, 4, 0)
+    sh.insert("b", 2, 2, 5, 5, 1)
+    assert sh.pairs(0, 1) == [("a", "b")]
+    sh.clear()
+    sh.insert("c", 40, 40, 44, 44, 1)
+    assert sh.pairs(0, 1) == []
+    assert sh.entry_count == 1
@@ -0,0 +1,44 @@
+# test_spawn_timeline.py
+# SpawnQueue が毎フレーム出す敵を、出現表を毎回全部調べる素朴な実装と比べる
+
+import random
+
+import pytest
+
+from spawn_timeline import PATTERNS, SpawnQueue, compile_timeline, every
+
+
+def _events(rng):
+    events = []
+    for _ in range(200):
+        events.append((rng.randrange(600), rng.randrange(4), rng.choice((None, 20, 60)), rng.choice(list(PATTERNS))))
+    events += every(100, 400, 30, 9, y=40, pattern="vee")
+    events += every(100, 400, 45, 8)                     # 上と同じ frame に重なる出現もある
+    return events
+
+
+def test_pop_due_matches_scan():
+    rng = random.Random(13)
+    events = _events(rng)
+    compiled = compile_timeline(events)
+    queue = SpawnQueue(compiled)
+    frame = -1
+    while frame < 700:
+        step = rng.choice((1, 1, 1, 5))                   # 何回分かまとめて進めることもある
+        prev, frame = frame, frame + step
+        # 同じ frame なら書いた順、まとめて進めたときは frame 順に出る
+        expected = [(t, y, p) for f, i, (_, t, y, p) in sorted((e[0], i, e) for i, e in enumerate(events))
+                    if prev < f <= frame]
+        assert list(queue.pop_due(frame)) == expected
+        later = [e[0] for e in events if e[0] > frame]
+        assert queue.next_frame() == (min(later) if later else None)
+        assert len(queue) == len(later)
+
+    # 元のヒープは書き換えないので、同じ表から次のキューを作れる
+    assert len(SpawnQueue(compiled)) == len(events)
+
+
+def test_every_and_unknown_pattern():
+    assert every(0, 10, 4, 2, y=5) == [(0, 2, 5, "single"), (4, 2, 5, "single"), (8, 2, 5, "single")]
+    with pytest.raises(ValueError):
+        compile_timeline([(0, 1, None, "spiral")])
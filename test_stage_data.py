@@ -0,0 +1,29 @@
+# test_stage_data.py
+# StageLoader がステージごとに1度だけ読み、prefetch() でも同じキャッシュを使うか調べる
+
+import json
+
+from stage_data import StageLoader
+
+
+def test_reads_each_stage_once(tmp_path):
+    for n in range(3):
+        (tmp_path / f"stage{n + 1}.json").write_text(json.dumps({"n": n}), encoding="utf-8")
+    compiled = []
+
+    def compile(raw):
+        compiled.append(raw["n"])
+        return ("stage", raw["n"])
+
+    loader = StageLoader(str(tmp_path), compile)
+    assert loader.get(0) == ("stage", 0)
+    assert loader.get(0) is loader.get(0)
+    loader.prefetch(1)
+    assert loader.loads == 2
+    assert loader.get(1) == ("stage", 1)
+    loader.prefetch(1)
+    loader.prefetch(7)             # ファイルのないステージは何もしない
+    assert loader.loads == 2
+    assert compiled == [0, 1]
+    assert loader.get(2) == ("stage", 2)
+    assert loader.loads == 3
@@ -0,0 +1,36 @@
+# test_sweep_prune.py
+# SweepAndPrune.pairs() を総当たりの二重ループと比べる (組だけでなく並び順も同じになること)
+
+import random
+
+from sweep_prune import SweepAndPrune
+
+RULES = [(2, 1), (2, 0), (3, 1)]
+
+
+class _Obj:
+    pass
+
+
+def test_pairs_match_nested_loops():
+    rng = random.Random(1)
+    sap = SweepAndPrune(RULES)
+    objs = [_Obj() for _ in range(80)]
+    for _ in range(300):
+        sap.begin()
+        boxes = []
+        # 毎フレーム一部が消えたり、グループや位置が変わったりする
+        for o in objs:
+            if rng.random() < 0.9:
+                g = rng.randrange(4)
+                x, y, w = rng.uniform(0, 200), rng.uniform(0, 100), rng.uniform(1, 10)
+                sap.add(o, x, y, x + w, y + w, g)
+                boxes.append((o, x, y, x + w, y + w, g))
+        got = sap.pairs()
+        for a, b in RULES:
+            expected = [(p[0], q[0]) for p in boxes if p[5] == a for q in boxes
+                        if q[5] == b and not (q[1] > p[3] or p[1] > q[3] or q[2] > p[4] or p[2] > q[4])]
+            assert got[(a, b)] == expected
+        counts = [sum(1 for box in boxes if box[5] == g) for g in range(4)]
+        assert sap.brute == sum(counts[a] * counts[b] for a, b in RULES)
+    assert not any(vars(o) for o in objs), "物に属性を書き込んだ"
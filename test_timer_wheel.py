@@ -0,0 +1,50 @@
+# test_timer_wheel.py
+# TimerWheel が呼ぶ回と順番を、全予約を毎回調べる素朴な実装と比べる
+# 段を小さくして (4 枠 x 2 段)、上の段からの下ろし (cascade) と overflow の入れ直しを何度も通す
+
+import random
+
+from timer_wheel import TimerWheel
+
+
+def test_matches_brute_force():
+    rng = random.Random(11)
+    wheel = TimerWheel(bits=2, levels=2)
+    ref = {}            # 予約番号 → [呼ぶ回, 予約した順]
+    entries = {}
+    log = []
+    expected = []
+    seq = 0
+
+    def fire(n):
+        log.append((wheel.now, n))
+        if rng.random() < 0.3:       # 呼ばれた中で次を予約する
+            add(rng.randrange(0, 40))
+
+    def add(delay):
+        nonlocal seq
+        seq += 1
+        ref[seq] = [wheel.now + max(1, delay), seq]
+        entries[seq] = wheel.schedule(delay, fire, seq)
+
+    for _ in range(3000):
+        for _ in range(rng.randrange(3)):
+            add(rng.choice((0, 1, 3, 4, 5, 15, 16, 17, 63, 64, 100)) + rng.randrange(3))
+        if ref and rng.random() < 0.2:
+            n = rng.choice(list(ref))
+            wheel.cancel(entries[n])
+            wheel.cancel(entries[n])  # 2度目は何もしない
+            del ref[n]
+
+        now = wheel.now + 1
+        due = sorted((s, n) for n, (when, s) in ref.items() if when == now)
+        for _, n in due:
+            del ref[n]
+        expected += [(now, n) for _, n in due]
+        wheel.advance()
+        assert wheel.now == now
+        assert log == expected
+        assert wheel.fired == len(due)
+        assert wheel.pending == len(wheel) == len(ref)
+
+    assert len(log) > 1000
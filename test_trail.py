@@ -0,0 +1,39 @@
+# test_trail.py
+# Trail を、粒ごとに dict を作ってリストを作り直す元の書き方と同じ手順で動かして比べる
+
+import random
+
+from trail import Trail
+
+
+def test_matches_particle_list():
+    rng = random.Random(4)
+    trail = Trail(12, 10)
+    ref = []                       # 古い順の粒
+    jit = random.Random(9)
+    jit_ref = random.Random(9)
+    for t in range(500):
+        if rng.random() < 0.8:
+            x, y, vy = rng.uniform(0, 160), rng.uniform(0, 120), rng.uniform(-1, 1)
+            trail.emit(x, y, vy)
+            ref.append({"x": x, "y": y, "vy": vy, "life": 10})
+        dx = rng.uniform(-2, 0)
+        if t % 3:
+            trail.step(dx)
+            for p in ref:
+                p["x"] += dx
+                p["y"] += p["vy"]
+                p["life"] -= 1
+        else:
+            # ゆらぎは古い粒から順に1回ずつ呼ぶ
+            trail.step(dx, lambda: (jit.uniform(-0.5, 0), jit.uniform(-0.5, 0.5)))
+            for p in ref:
+                jx, jy = jit_ref.uniform(-0.5, 0), jit_ref.uniform(-0.5, 0.5)
+                p["x"] += dx + jx
+                p["y"] += p["vy"] + jy
+                p["life"] -= 1
+        ref = [p for p in ref if p["life"] > 0]
+        assert list(trail.puffs()) == [(p["x"], p["y"], p["life"]) for p in ref]
+
+    trail.clear()
+    assert list(trail.puffs()) == []
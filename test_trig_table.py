@@ -0,0 +1,61 @@
+# test_trig_table.py
+# 表引きの向きと揺れを math の sin/cos/atan2 と比べる
+
+import math
+import random
+
+import pytest
+
+from trig_table import ANGLE_STEPS, SwayCurve, aim, deg, fan, ring, spread
+
+
+def _ref(degrees, speed):
+    r = math.radians(degrees)
+    return math.cos(r) * speed, math.sin(r) * speed
+
+
+def test_deg_is_exact_for_quarter_degrees():
+    assert deg(0) == 0 and deg(360) == 0 and deg(-90) == deg(270)
+    assert deg(15) * 360 == 15 * ANGLE_STEPS
+
+
+def test_fan_ring_spread_match_math():
+    for speed in (1.0, 2.2, 3.5):
+        vx, vy = fan([deg(a) for a in (-45, -20, 0, 20, 45, 170)], speed)
+        for i, a in enumerate((-45, -20, 0, 20, 45, 170)):
+            assert (vx[i], vy[i]) == pytest.approx(_ref(a, speed), abs=1e-12)
+
+        vx, vy = ring(12, speed)
+        for i in range(12):
+            assert (vx[i], vy[i]) == pytest.approx(_ref(30 * i, speed), abs=1e-12)
+
+        vx, vy = spread(deg(180), deg(15), 7, speed)
+        for i in range(7):
+            assert (vx[i], vy[i]) == pytest.approx(_ref(180 + 15 * (i - 3), speed), abs=1e-12)
+
+
+def test_fan_is_cached_and_read_only():
+    a = fan([deg(10), deg(20)], 2.0)
+    assert fan((deg(10), deg(20)), 2.0) is a
+    with pytest.raises(ValueError):
+        a[0][0] = 1.0
+
+
+def test_aim_matches_atan2():
+    rng = random.Random(2)
+    for _ in range(1000):
+        dx, dy, speed = rng.uniform(-200, 200), rng.uniform(-200, 200), rng.uniform(0.5, 4)
+        angle = math.atan2(dy, dx)
+        assert aim(dx, dy, speed) == pytest.approx((math.cos(angle) * speed, math.sin(angle) * speed), abs=1e-12)
+    assert aim(0, 0, 1.5) == (1.5, 0.0)
+
+
+def test_sway_curve_is_one_period_table():
+    for freq, amp in ((0.15, 15), (0.05, 40.0), (0.1, 8)):
+        sway = SwayCurve(freq, amp)
+        steps = round(2 * math.pi / freq)
+        assert len(sway.values) == steps
+        for t in range(3 * steps):
+            assert sway(t) == pytest.approx(math.sin(2 * math.pi * t / steps) * amp, abs=1e-9)
+        # 丸めた周期は本物の周期と1段未満しか違わない
+        assert abs(steps - 2 * math.pi / freq) <= 0.5
@@ -0,0 +1,103 @@
+# timer_wheel.py
+# 弾の撃ち直し・出現などの「n 回後に起こす」を1か所で管理する階層タイマーホイール
+# 物ごとにカウンタを毎フレーム減らしたり frame % n を調べたりする代わりに、次に起こす時刻を予約しておき、
+# advance() ではその時刻になった予約だけを呼ぶ。待っている物がいくら多くても、1回の更新の手間は
+# 起こす数 (と、上の段から下ろす予約の数) にしか比例しない。pyxel には依存しない。
+#
+# 段 0 は 1 枠 = 1 回の更新で 2**bits 枠、段 1 は 1 枠 = 段 0 の1周、… と levels 段ある。
+# 遠い予約は上の段に入れておき、その枠の時刻が来たら下の段へ移す。どの段にも入らない遠さの予約は
+# overflow に置き、一番上の段が1周するたびに入れ直す。
+
+
+class TimerWheel:
+    """schedule(delay, fn, *args) で delay 回後の advance() に fn(*args) を呼ぶ
+
+    同じ回に起こす予約は予約した順に呼ぶ。呼ばれた fn の中で次の予約をしてよい (delay は 1 以上)。
+    """
+
+    def __init__(self, bits=6, levels=3):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.wheels = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+        self.overflow = []
+        self.now = 0           # advance() した回数
+        self.pending = 0       # 待っている予約の数 (取り消したものを除く)
+        self.fired = 0         # 直前の advance() で呼んだ数
+        self._seq = 0
+
+    def __len__(self):
+        return self.pending
+
+    def schedule(self, delay, fn, *args):
+        """予約を返す (cancel() に渡せる)。delay が 1 未満なら次の advance() で呼ぶ"""
+        self._seq += 1
+        entry = [self.now + max(1, delay), self._seq, fn, args]
+        self._place(entry)
+        self.pending += 1
+        return entry
+
+    def cancel(self, entry):
+        """予約を取り消す (入っている枠からは、その枠の番が来たときに捨てる)"""
+        if entry[2] is not None:
+            entry[2] = None
+            self.pending -= 1
+
+    def _place(self, entry):
+        when = entry[0]
+        d = when - self.now
+        bits = self.bits
+        for level in range(self.levels):
+            if d < 1 << (bits * (level + 1)):
+                self.wheels[level][(when >> (bits * level)) & self.mask].append(entry)
+                return
+        self.overflow.append(entry)
+
+    def _cascade(self, level):
+        # 段 level の今の枠を下の段へ入れ直す
+        slot = self.wheels[level][(self.now >> (self.bits * level)) & self.mask]
+        if slot:
+            entries = slot[:]
+            slot.clear()
+            for entry in entries:
+                if entry[2] is not None:
+                    self._place(entry)
+
+    def advance(self):
+        """1回分進めて、この回の予約を呼ぶ"""
+        self.now += 1
+        now = self.now
+        bits = self.bits
+        if now & ((1 << (bits * self.levels)) - 1) == 0 and self.overflow:
+            entries = self.overflow
+            self.overflow = []
+            for entry in entries:
+                if entry[2] is not None:
+                    self._place(entry)
+        # 上の段から順に、枠の変わり目に来た段を下ろす
+        for level in range(self.levels - 1, 0, -1):
+            if now & ((1 << (bits * level)) - 1) == 0:
+                self._cascade(level)
+
+        slot = self.wheels[0][now & self.mask]
+        if not slot:
+            self.fired = 0
+            return
+        due = slot[:]
+        slot.clear()
+        if len(due) > 1:
+            due.sort(key=_seq_of)
+        fired = 0
+        for entry in due:
+            fn = entry[2]
+            if fn is None:
+                continue
+            entry[2] = None
+            self.pending -= 1
+            fired += 1
+            fn(*entry[3])
+        self.fired = fired
+
+
+def _seq_of(entry):
+    return entry[1]
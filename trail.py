@@ -0,0 +1,63 @@
+# trail.py
+# 自機・オプションなどの排気の軌跡
+# 粒ごとに dict を作ってフレームごとにリストを作り直す代わりに、長さを決めたリングバッファの
+# x/y/vy/life に上書きしていく (一番古い粒の場所に新しい粒を書く)。粒が消えても詰め直さない。
+# 描画は各ゲーム側 (life ごとに描いておいた粒のスプライトを blt する)。pyxel には依存しない。
+
+
+class Trail:
+    """長さ size のリングバッファに入れる排気の粒。emit() した粒は life 回の step() で消える
+
+    size は1つの粒が消えるまでに出す数以上にしておく (足りないと古い粒から上書きされる)。
+    """
+
+    def __init__(self, size, life):
+        self.size = size
+        self.max_life = life
+        self.x = [0.0] * size
+        self.y = [0.0] * size
+        self.vy = [0.0] * size
+        self.life = [0] * size
+        self.head = 0          # 次に書く位置 (= 一番古い粒)
+
+    def clear(self):
+        life = self.life
+        for i in range(self.size):
+            life[i] = 0
+
+    def emit(self, x, y, vy=0.0):
+        i = self.head
+        self.x[i] = x
+        self.y[i] = y
+        self.vy[i] = vy
+        self.life[i] = self.max_life
+        self.head = (i + 1) % self.size
+
+    def _oldest_first(self):
+        h = self.head
+        return (*range(h, self.size), *range(h))
+
+    def step(self, dx, jitter=None):
+        """生きている粒を x へ dx、y へ粒ごとの vy だけ動かし life を1減らす
+
+        jitter を渡すと粒ごとに呼んで、返した (jx, jy) も足す (古い粒から順に呼ぶ)。
+        """
+        x, y, vy, life = self.x, self.y, self.vy, self.life
+        for i in self._oldest_first():
+            if life[i] <= 0:
+                continue
+            if jitter is None:
+                x[i] += dx
+                y[i] += vy[i]
+            else:
+                jx, jy = jitter()
+                x[i] += dx + jx
+                y[i] += vy[i] + jy
+            life[i] -= 1
+
+    def puffs(self):
+        """生きている粒の (x, y, life) を古い順に返す"""
+        x, y, life = self.x, self.y, self.life
+        for i in self._oldest_first():
+            if life[i] > 0:
+                yield x[i], y[i], life[i]
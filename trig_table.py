@@ -0,0 +1,81 @@
+# trig_table.py
+# 弾の向きと揺れの三角関数を表引きにする共有モジュール
+# 角度は1周 ANGLE_STEPS 段の整数 (固定小数点の角度) で表し、sin/cos は起動時に作った表を引くだけにする。
+# 1周を 1440 段 (0.25 度刻み) にしているので、今の弾幕で使う 5 度・15 度・30 度刻みの向きはずれなく表せる。
+# 自機狙いは atan2 → cos/sin の代わりに、向きのベクトルを長さで割って速さを掛ける。
+# 全方位・扇状の弾は (数, 向き, 速さ) ごとに速度の配列を1度だけ作って使い回すので、
+# 周回で弾の数が増えても1回に撃つ手間は配列を弾ストアへ写す分しか増えない。
+# 敵やボスの上下の揺れ sin(t * freq) * amp は SwayCurve で1周期分の表を作っておき、回 t で引く。pyxel には依存しない。
+
+import math
+
+import numpy as np
+
+ANGLE_STEPS = 1440
+SIN = [math.sin(2 * math.pi * i / ANGLE_STEPS) for i in range(ANGLE_STEPS)]
+COS = [math.cos(2 * math.pi * i / ANGLE_STEPS) for i in range(ANGLE_STEPS)]
+_SIN = np.array(SIN)
+_COS = np.array(COS)
+
+_fans = {}
+
+
+def deg(degrees):
+    """度を角度の段数にする"""
+    return round(degrees * ANGLE_STEPS / 360) % ANGLE_STEPS
+
+
+def aim(dx, dy, speed):
+    """(dx, dy) の向きに速さ speed で進む速度 (vx, vy)。長さが 0 なら +x の向き (atan2(0, 0) = 0 と同じ)"""
+    d = math.hypot(dx, dy)
+    if d == 0:
+        return speed, 0.0
+    k = speed / d
+    return dx * k, dy * k
+
+
+def fan(angles, speed):
+    """角度の段数の並び angles に速さ speed で撃つ弾の速度の配列 (vx, vy)。同じ引数なら同じ配列を返す
+
+    返す配列は書き換えない (spawn_batch に渡すとストア側に写される)。
+    """
+    key = (tuple(angles), speed)
+    v = _fans.get(key)
+    if v is None:
+        a = np.array(key[0], dtype=np.intp) % ANGLE_STEPS
+        vx = speed * _COS[a]
+        vy = speed * _SIN[a]
+        vx.flags.writeable = False
+        vy.flags.writeable = False
+        v = _fans[key] = (vx, vy)
+    return v
+
+
+def ring(count, speed, phase=0):
+    """phase から1周を count 等分した全方位弾の速度の配列 (ANGLE_STEPS が count で割り切れること)"""
+    step = ANGLE_STEPS // count
+    return fan(range(phase, phase + step * count, step), speed)
+
+
+def spread(center, step, count, speed):
+    """center を中心に step 段おきに count 発並べた扇状の弾の速度の配列 (step * (count - 1) は偶数にする)"""
+    first = center - step * (count - 1) // 2
+    return fan(range(first, first + step * count, step), speed)
+
+
+class SwayCurve:
+    """sin(t * freq) * amp の1周期を round(2π / freq) 段の表にした揺れ (同じ揺れ方の敵で共有する)
+
+    表は作るときに1度だけ計算し、回 t では t % 段数 を引くだけ。周期を整数の回に丸めるので、
+    揺れの速さは freq から段数の丸め分 (1 段未満) だけずれる。
+    """
+
+    def __init__(self, freq, amp):
+        self.freq = freq
+        self.amp = amp
+        steps = max(1, round(2 * math.pi / freq))
+        self.values = [math.sin(2 * math.pi * i / steps) * amp for i in range(steps)]
+
+    def __call__(self, t):
+        values = self.values
+        return values[t % len(values)]